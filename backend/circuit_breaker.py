@@ -0,0 +1,109 @@
+"""Circuit breaker with a client-side deadline for storage calls
+
+Every call is bounded by `timeout_seconds`. After `failure_threshold`
+consecutive timeouts or availability failures (the `failures` exception
+types) the breaker opens: calls fail immediately with UnavailableError for
+`reset_seconds`, so requests don't pile up behind a slow or dead database.
+Then one trial call is let through (half-open); its success closes the
+breaker, its failure opens it again.
+
+Any other exception (a duplicate, a bad query, a bug) says nothing about
+the dependency's health: it is re-raised unchanged and not counted.
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Optional, Tuple, Type, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UnavailableError(Exception):
+    """The call was refused by the open breaker, failed with an availability error or timed out"""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Guards one dependency; only timeouts and `failures` count against it"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        timeout_seconds: float = 5.0,
+        failures: Tuple[Type[BaseException], ...] = ()
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.timeout_seconds = timeout_seconds
+        self.failures = (asyncio.TimeoutError,) + tuple(failures)
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._trial_running or time.monotonic() - self._opened_at < self.reset_seconds:
+            return OPEN
+        return HALF_OPEN
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being refused"""
+        return self.state == OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a trial call through"""
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def _record_success(self):
+        if self._opened_at is not None:
+            logger.info(f"{self.name} recovered; closing circuit")
+        self._failures = 0
+        self._opened_at = None
+
+    def _record_failure(self, error: BaseException):
+        self._failures += 1
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.error(f"{self.name} failed {self._failures} times in a row; opening circuit: {error!r}")
+            self._opened_at = time.monotonic()
+
+    async def call(self, operation: Awaitable[T]) -> T:
+        """Await `operation` within the deadline; raises UnavailableError when the breaker
+        is open or the call timed out or failed with one of `failures`"""
+        state = self.state
+        if state == OPEN:
+            if asyncio.iscoroutine(operation):
+                operation.close()
+            raise UnavailableError(f"{self.name} unavailable", retry_after=max(1.0, self.retry_after()))
+
+        trial = state == HALF_OPEN
+        if trial:
+            self._trial_running = True
+        try:
+            result = await asyncio.wait_for(operation, self.timeout_seconds)
+        except self.failures as e:
+            self._record_failure(e)
+            message = "timed out" if isinstance(e, asyncio.TimeoutError) else "failed"
+            raise UnavailableError(f"{self.name} call {message}: {e!r}", retry_after=max(1.0, self.retry_after())) from e
+        finally:
+            if trial:
+                self._trial_running = False
+        self._record_success()
+        return result
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import random
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Name of the stored schedule, and of the lease taken to extend it
+SCHEDULE_NAME = "daily_challenge"
+
+# How long a worker that found the lease taken waits for the holder to save
+LEASE_WAIT_ATTEMPTS = 5
+LEASE_WAIT_SECONDS = 0.2
+
+
+def _covers(state: Optional[dict], first_day: date, last_day: date) -> bool:
+    days = state["days"] if state else {}
+    return all(
+        (first_day + timedelta(days=offset)).isoformat() in days
+        for offset in range((last_day - first_day).days + 1)
+    )
+
+
+def extend_schedule(state: Optional[dict], idea_ids: List[str], first_day: date, last_day: date) -> dict:
+    """Schedule every unscheduled day in [first_day, last_day]; earlier days are dropped
+
+    Ideas are drawn without replacement: `used` holds the ideas of the
+    current cycle, and a new cycle starts only once every idea has been used.
+    Ideas added mid-cycle simply join the undrawn ones.
+    """
+    state = state or {"cycle": 0, "used": [], "days": {}}
+    days = {day: idea_id for day, idea_id in state["days"].items() if date.fromisoformat(day) >= first_day}
+    cycle, used = state["cycle"], list(state["used"])
+
+    drawn = set(used)
+    remaining = [idea_id for idea_id in idea_ids if idea_id not in drawn]
+    random.shuffle(remaining)
+    day = first_day
+    while day <= last_day:
+        if day.isoformat() not in days:
+            if not remaining:
+                cycle, used = cycle + 1, []
+                remaining = list(idea_ids)
+                random.shuffle(remaining)
+            idea_id = remaining.pop()
+            used.append(idea_id)
+            days[day.isoformat()] = idea_id
+        day += timedelta(days=1)
+    return {"cycle": cycle, "used": used, "days": days}
+
+
+class DailyChallengeSchedule:
+    """"Challenge of the Day" schedule, stored next to the ideas
+
+    Dates map to idea ids in the repository, so every replica and every
+    restarted worker serves the same challenge. When the stored schedule
+    does not reach `horizon_days` ahead, one worker extends it under a
+    lease (see extend_schedule); the others wait briefly and read the
+    result. Days already scheduled never change, so a submission made
+    mid-day never changes today's challenge. Ideas themselves come from
+    the in-memory idea pool rather than a scan of the corpus.
+    """
+
+    def __init__(self, horizon_days: int = 30, lease_seconds: float = 60.0):
+        self.horizon_days = horizon_days
+        self.lease_seconds = lease_seconds
+        self._days: Dict[date, dict] = {}
+        self._built_for: Optional[date] = None
+        self._lock = asyncio.Lock()
+        self._rebuild_task: Optional[asyncio.Task] = None
+
+    async def _stored(self, repository, pool, owner: str, first_day: date, last_day: date) -> Optional[dict]:
+        state = await repository.get_schedule(SCHEDULE_NAME)
+        if _covers(state, first_day, last_day) or not len(pool):
+            return state
+
+        if not await repository.acquire_lease(SCHEDULE_NAME, owner, self.lease_seconds):
+            logger.info("Daily challenge schedule is being extended by another worker")
+            for _ in range(LEASE_WAIT_ATTEMPTS):
+                await asyncio.sleep(LEASE_WAIT_SECONDS)
+                state = await repository.get_schedule(SCHEDULE_NAME)
+                if _covers(state, first_day, last_day):
+                    break
+            return state
+
+        try:
+            # Another worker may have extended it before we got the lease
+            state = await repository.get_schedule(SCHEDULE_NAME)
+            if not _covers(state, first_day, last_day):
+                state = extend_schedule(state, pool.ids(), first_day, last_day)
+                await repository.save_schedule(SCHEDULE_NAME, state)
+                logger.info(f"Daily challenge schedule extended to {last_day} over {len(pool)} ideas")
+            return state
+        finally:
+            await repository.release_lease(SCHEDULE_NAME, owner)
+
+    async def rebuild(self, repository, pool, owner: str, today: Optional[date] = None):
+        """Load (extending it if needed) the schedule from yesterday through today + horizon (UTC)"""
+        today = today or datetime.utcnow().date()
+        # Keep yesterday and tomorrow around for timezones on either side of UTC
+        first_day = today - timedelta(days=1)
+        last_day = first_day + timedelta(days=self.horizon_days + 1)
+        async with self._lock:
+            if not pool.is_warm:
+                await pool.refresh(repository)
+            state = await self._stored(repository, pool, owner, first_day, last_day)
+
+            scheduled = {
+                date.fromisoformat(day): idea_id
+                for day, idea_id in (state["days"] if state else {}).items()
+                if date.fromisoformat(day) >= first_day
+            }
+            if any(pool.lookup(idea_id) is None for idea_id in scheduled.values()):
+                # Picked by a worker that has seen newer ideas than this pool
+                await pool.refresh(repository)
+            self._days = {
+                day: idea for day, idea in
+                ((day, pool.lookup(idea_id)) for day, idea_id in scheduled.items())
+                if idea is not None
+            }
+            if _covers(state, first_day, last_day):
+                self._built_for = today
+
+    def schedule_rebuild(self, repository, pool, owner: str):
+        """Rebuild in the background once per UTC day"""
+        if self._built_for == datetime.utcnow().date():
+            return
+        if self._rebuild_task and not self._rebuild_task.done():
+            return
+        self._rebuild_task = asyncio.create_task(self._rebuild_quietly(repository, pool, owner))
+
+    async def _rebuild_quietly(self, repository, pool, owner: str):
+        try:
+            await self.rebuild(repository, pool, owner)
+        except Exception as e:
+            logger.error(f"Error building daily challenge schedule: {e}")
+
+    def get(self, day: date) -> Optional[dict]:
+        return self._days.get(day)
+
+
+def next_midnight(now: datetime) -> datetime:
+    """The next local midnight after `now` (an aware datetime), in the same zone"""
+    tomorrow = now.date() + timedelta(days=1)
+    return datetime.combine(tomorrow, dt_time.min, tzinfo=now.tzinfo)
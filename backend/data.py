@@ -20,4 +20,27 @@ DEFAULT_DRAWING_IDEAS = [
     "Illustrate a fox wearing autumn leaves as a crown",
     "Draw a mountain range that looks like sleeping giants",
     "Sketch a hot air balloon shaped like a jellyfish"
-]
\ No newline at end of file
+]
+# Themes for the default ideas, keyed by their text
+DEFAULT_IDEA_TAGS = {
+    "Draw a cat wearing a wizard hat": ["animals", "fantasy"],
+    "Sketch a tree house in a magical forest": ["fantasy", "nature"],
+    "Design a robot that makes pancakes": ["sci-fi", "food"],
+    "Draw your favorite animal as a superhero": ["animals"],
+    "Illustrate a city floating in the clouds": ["fantasy"],
+    "Sketch a dragon reading a book": ["fantasy", "animals"],
+    "Draw a spaceship shaped like a fruit": ["sci-fi", "food"],
+    "Design a cozy cafe on Mars": ["sci-fi", "food"],
+    "Illustrate a mermaid's underwater garden": ["fantasy", "nature"],
+    "Draw a phoenix rising from coffee steam": ["fantasy", "food"],
+    "Sketch a castle made of ice cream": ["fantasy", "food"],
+    "Design a time machine disguised as a phone booth": ["sci-fi"],
+    "Draw a wise owl teaching at a blackboard": ["animals"],
+    "Illustrate a pirate ship sailing through stars": ["sci-fi", "fantasy"],
+    "Sketch a butterfly with galaxy wings": ["animals", "sci-fi"],
+    "Draw a friendly monster hosting a tea party": ["fantasy", "food"],
+    "Design a lighthouse in a bottle": ["nature"],
+    "Illustrate a fox wearing autumn leaves as a crown": ["animals", "nature"],
+    "Draw a mountain range that looks like sleeping giants": ["nature"],
+    "Sketch a hot air balloon shaped like a jellyfish": ["animals", "nature"],
+}
@@ -0,0 +1,167 @@
+"""Server-Sent Events fan-out of newly created ideas
+
+Writes publish to an in-process hub; every subscriber (one open
+/ideas/stream response) owns a small bounded queue. Events are encoded once
+and the same bytes object is queued for everyone, so an idle subscriber
+costs one queue and a suspended generator. A subscriber that falls
+`queue_size` events behind has its backlog dropped and receives a single
+`resync` event telling it to reload, rather than slowing down publishers.
+
+With MongoDB, a change stream can feed the hub instead so subscribers of
+every replica see every insert; writes then no longer publish locally. While
+the change stream is down (or cannot start, e.g. on a standalone server)
+writes publish locally again.
+
+Each response ends after about `max_stream_seconds` (EventSource clients
+reconnect on their own), and closing the hub ends every open response, so
+streams never hold a connection or a graceful shutdown for long.
+"""
+import asyncio
+import logging
+import random
+from typing import AsyncIterator, Optional, Set
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Delay before retrying a failed change stream, in seconds; doubles up to the maximum
+CHANGE_STREAM_RETRY_SECONDS = 5.0
+CHANGE_STREAM_MAX_RETRY_SECONDS = 300.0
+
+# Stream lifetimes are spread by up to this fraction so clients don't all reconnect at once
+LIFETIME_JITTER = 0.1
+
+
+class TooManySubscribersError(Exception):
+    """The worker is already serving its maximum number of streams"""
+
+
+def encode_event(event: str, data) -> bytes:
+    """One SSE frame"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+RESYNC_EVENT = encode_event("resync", {})
+KEEPALIVE = b": keep-alive\n\n"
+# Queued to a subscriber to end its response
+END_OF_STREAM = b""
+
+
+class IdeaStreamHub:
+    """In-process broadcast of idea events to SSE subscribers"""
+
+    def __init__(
+        self,
+        queue_size: int = 64,
+        max_subscribers: int = 10000,
+        heartbeat_seconds: float = 15.0,
+        max_stream_seconds: float = 300.0
+    ):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.heartbeat_seconds = heartbeat_seconds
+        self.max_stream_seconds = max_stream_seconds
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._source_task: Optional[asyncio.Task] = None
+        self._change_stream_open = False
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def uses_change_stream(self) -> bool:
+        """True while a change stream is delivering inserts; writes then don't publish locally"""
+        return self._change_stream_open
+
+    def subscribe(self) -> asyncio.Queue:
+        if self._closed or len(self._subscribers) >= self.max_subscribers:
+            raise TooManySubscribersError()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _broadcast(self, frame: bytes):
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and have it reload instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(END_OF_STREAM if frame is END_OF_STREAM else RESYNC_EVENT)
+
+    def publish_idea(self, idea: dict):
+        """Announce one new idea (also a count delta of 1)"""
+        if self._subscribers:
+            self._broadcast(encode_event("idea", {"idea": idea, "delta": 1}))
+
+    def publish_count(self, delta: int):
+        """Announce ideas added in bulk without sending each of them"""
+        if self._subscribers and delta:
+            self._broadcast(encode_event("count", {"delta": delta}))
+
+    async def events(self, queue: asyncio.Queue) -> AsyncIterator[bytes]:
+        """SSE body for one subscriber; ends after its lifetime or when the hub closes,
+        and unsubscribes when the client goes away"""
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + self.max_stream_seconds * (1 + random.random() * LIFETIME_JITTER)
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                remaining = ends_at - loop.time()
+                if remaining <= 0:
+                    return
+                try:
+                    frame = await asyncio.wait_for(queue.get(), min(self.heartbeat_seconds, remaining))
+                except asyncio.TimeoutError:
+                    frame = KEEPALIVE
+                if frame is END_OF_STREAM:
+                    return
+                yield frame
+        finally:
+            self.unsubscribe(queue)
+
+    def start_change_stream(self, repository):
+        """Feed the hub from the repository's insert stream (MongoDB replica sets only)"""
+        if self._source_task is None:
+            self._source_task = asyncio.create_task(self._follow(repository))
+
+    async def _follow(self, repository):
+        retry_seconds = CHANGE_STREAM_RETRY_SECONDS
+        while True:
+            try:
+                async for idea in repository.watch_inserts():
+                    if idea is None:
+                        # Open: inserts from every replica arrive here from now on
+                        self._change_stream_open = True
+                        retry_seconds = CHANGE_STREAM_RETRY_SECONDS
+                        continue
+                    self.publish_idea(idea)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error following idea change stream (publishing local writes instead): {e}")
+            if self._change_stream_open:
+                self._change_stream_open = False
+                # Other replicas' inserts may have been missed: have everyone reload once
+                self._broadcast(RESYNC_EVENT)
+            await asyncio.sleep(retry_seconds)
+            retry_seconds = min(retry_seconds * 2, CHANGE_STREAM_MAX_RETRY_SECONDS)
+
+    async def close(self):
+        """Stop following the change stream and end every open response"""
+        self._closed = True
+        if self._source_task:
+            self._source_task.cancel()
+            try:
+                await self._source_task
+            except asyncio.CancelledError:
+                pass
+            self._source_task = None
+            self._change_stream_open = False
+        self._broadcast(END_OF_STREAM)
@@ -0,0 +1,76 @@
+import gzip
+import time
+from typing import Optional, Tuple
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+class CollectionVersion:
+    """Monotonic version number of a collection, shared through the repository
+
+    Writers bump the stored counter; readers reuse the last value they saw
+    for up to `sync_interval_seconds`, so validating a cached response usually
+    costs no database round trip. Writes made by this process are visible
+    immediately, writes from other replicas within the sync interval.
+    """
+
+    def __init__(self, name: str, sync_interval_seconds: float = 1.0):
+        self.name = name
+        self.sync_interval_seconds = sync_interval_seconds
+        self.value = 0
+        self._synced_at: Optional[float] = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._synced_at is not None
+            and time.monotonic() - self._synced_at <= self.sync_interval_seconds
+        )
+
+    async def bump(self, repository) -> int:
+        self.value = max(self.value, await repository.bump_version(self.name))
+        self._synced_at = time.monotonic()
+        return self.value
+
+    async def current(self, repository) -> int:
+        if not self._is_fresh():
+            self.value = max(self.value, await repository.get_version(self.name))
+            self._synced_at = time.monotonic()
+        return self.value
+
+
+def etag_for(version: int) -> str:
+    # Weak because the identity and gzip bodies share one tag
+    return f'W/"ideas-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    # Weak comparison: ignore the W/ prefix on either side
+    bare = etag[2:] if etag.startswith("W/") else etag
+    return any((tag[2:] if tag.startswith("W/") else tag) == bare for tag in candidates)
+
+
+class SerializedBodyCache:
+    """Holds the serialized (and gzip-compressed) body for one collection version"""
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._body = b""
+        self._gzip_body: Optional[bytes] = None
+
+    def get(self, version: int) -> Optional[Tuple[bytes, Optional[bytes]]]:
+        if self._version != version:
+            return None
+        return self._body, self._gzip_body
+
+    def put(self, version: int, body: bytes) -> Tuple[bytes, Optional[bytes]]:
+        gzip_body = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None
+        # Never let a slow rebuild overwrite a newer version
+        if self._version is None or version >= self._version:
+            self._version, self._body, self._gzip_body = version, body, gzip_body
+        return body, gzip_body
@@ -0,0 +1,257 @@
+"""In-process metrics with a Prometheus text exposition
+
+Request metrics are recorded by an ASGI middleware and MongoDB timings by
+pymongo monitoring listeners. Recording is a dict lookup and a few additions
+under a lock, cheap enough to leave on in production.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from pymongo import monitoring
+
+# Latency buckets in seconds, from sub-millisecond in-memory hits to slow queries
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Commands timed individually; anything else is recorded as "other"
+TRACKED_COMMANDS = {
+    "find", "getMore", "aggregate", "count", "distinct", "insert", "update",
+    "delete", "findAndModify", "createIndexes", "ping", "killCursors",
+}
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((values, list(series)) for values, series in self._values.items())
+        lines = self.header()
+        for values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _format_labels(self.labels, values, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(Counter(
+    "emalfdraw_http_requests_total", "HTTP requests handled", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "emalfdraw_http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "emalfdraw_http_requests_in_flight", "HTTP requests currently being handled"
+))
+mongo_command_duration_seconds = registry.register(Histogram(
+    "emalfdraw_mongo_command_duration_seconds", "MongoDB command latency", ("command", "outcome")
+))
+mongo_pool_checkout_wait_seconds = registry.register(Histogram(
+    "emalfdraw_mongo_pool_checkout_wait_seconds", "Time spent waiting for a pooled MongoDB connection",
+    ("outcome",)
+))
+
+
+class PrometheusMiddleware:
+    """ASGI middleware recording count, in-flight and latency per route template
+
+    Routes are labelled by their path template (e.g. /api/ideas) rather than
+    the raw URL so label cardinality stays bounded.
+    """
+
+    def __init__(self, app, skip_paths: Iterable[str] = ()):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_requests_total.inc(scope["method"], template, status)
+            http_request_duration_seconds.observe(elapsed, scope["method"], template, status)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command sent by the Motor client"""
+
+    @staticmethod
+    def _name(event) -> str:
+        return event.command_name if event.command_name in TRACKED_COMMANDS else "other"
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongo_command_duration_seconds.observe(event.duration_micros / 1e6, self._name(event), "success")
+
+    def failed(self, event):
+        mongo_command_duration_seconds.observe(event.duration_micros / 1e6, self._name(event), "failure")
+
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Measures connection checkout wait
+
+    Checkout start and finish are reported on the same driver thread, so a
+    thread-local start time pairs them without any shared state.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def _finish(self, outcome: str):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            mongo_pool_checkout_wait_seconds.observe(time.perf_counter() - started, outcome)
+            self._local.started = None
+
+    def connection_checked_out(self, event):
+        self._finish("success")
+
+    def connection_check_out_failed(self, event):
+        self._finish("failure")
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+
+def mongo_listeners() -> list:
+    """Listeners to pass as `event_listeners` to the Motor client"""
+    return [MongoCommandMetrics(), MongoPoolMetrics()]
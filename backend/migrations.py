@@ -0,0 +1,109 @@
+"""One-off data migrations for the drawing_ideas collection.
+
+Each migration is idempotent and safe to run on every startup; it can also be
+run by hand with `python migrations.py`.
+"""
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+from models import normalize_idea_text
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Unique index on text_key, built by MongoIdeaRepository.setup once keys are collision-free
+TEXT_KEY_INDEX = "text_key_unique"
+
+
+async def backfill_text_keys(collection, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Populate `text_key` on documents written before it existed
+
+    Documents whose key collides with an older document (e.g. "Cat" and "cat "
+    slipped past the old regex check) keep their text but get a key suffixed
+    with their id, so the unique index can still be built. Collisions are
+    resolved whenever that index does not exist yet. Returns the number of
+    documents updated.
+    """
+    updated = 0
+    batch = []
+    cursor = collection.find(
+        {"text_key": {"$exists": False}},
+        {"_id": 1, "text": 1}
+    ).batch_size(batch_size)
+
+    async for doc in cursor:
+        batch.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"text_key": normalize_idea_text(doc.get("text", ""))}}
+        ))
+        if len(batch) >= batch_size:
+            result = await collection.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+
+    if batch:
+        result = await collection.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+
+    # Also whenever the unique index is still missing: an earlier run may have
+    # backfilled the keys and stopped before resolving their collisions
+    if updated or TEXT_KEY_INDEX not in await collection.index_information():
+        collisions = await _resolve_key_collisions(collection)
+        logger.info(f"Backfilled text_key on {updated} ideas ({collisions} duplicate keys suffixed)")
+    return updated
+
+
+async def _resolve_key_collisions(collection) -> int:
+    """Keep the oldest idea per key and suffix the key of the others"""
+    pipeline = [
+        {"$sort": {"created_at": 1}},
+        {"$group": {"_id": "$text_key", "ids": {"$push": "$id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    fixes = []
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        for idea_id in group["ids"][1:]:
+            fixes.append(UpdateOne(
+                {"id": idea_id},
+                {"$set": {"text_key": f"{group['_id']}#{idea_id}"}}
+            ))
+
+    if fixes:
+        await collection.bulk_write(fixes, ordered=False)
+    return len(fixes)
+
+
+async def backfill_tags(collection) -> int:
+    """Give ideas written before tags existed an empty tag list"""
+    result = await collection.update_many({"tags": {"$exists": False}}, {"$set": {"tags": []}})
+    if result.modified_count:
+        logger.info(f"Backfilled tags on {result.modified_count} ideas")
+    return result.modified_count
+
+
+async def run_migrations(db):
+    """Apply all migrations in order"""
+    await backfill_text_keys(db.drawing_ideas)
+    await backfill_tags(db.drawing_ideas)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    logging.basicConfig(level=logging.INFO)
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        try:
+            await run_migrations(client[os.environ['DB_NAME']])
+        finally:
+            client.close()
+
+    asyncio.run(main())
@@ -1,19 +1,108 @@
-from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import List, Literal, Optional
+from datetime import datetime, timezone
+import unicodedata
 import uuid
 
+# Fields exposed to clients, and the matching Mongo projection (no _id / text_key)
+IDEA_RESPONSE_FIELDS = ("id", "text", "created_at", "user_submitted", "tags")
+IDEA_RESPONSE_PROJECTION = {"_id": 0, **{field: 1 for field in IDEA_RESPONSE_FIELDS}}
+
+# Write-behind popularity counters stored on each idea
+IDEA_COUNTER_FIELDS = ("served_count", "drawn_count")
+
+def normalize_idea_text(text: str) -> str:
+    """Duplicate-detection key: Unicode-normalized, casefolded, whitespace-collapsed"""
+    folded = unicodedata.normalize("NFKC", unicodedata.normalize("NFKC", text).casefold())
+    return " ".join(folded.split())
+
+MAX_TAGS_PER_IDEA = 5
+MAX_TAG_LENGTH = 30
+
+def normalize_tag(tag: str) -> str:
+    """Canonical tag: casefolded, words joined by hyphens ("Sci Fi" -> "sci-fi")"""
+    return "-".join(unicodedata.normalize("NFKC", tag).casefold().split())
+
+def normalize_tags(tags: List[str]) -> List[str]:
+    """Normalize, drop empties and duplicates (keeping order), and enforce the limits"""
+    normalized = []
+    for tag in tags:
+        tag = normalize_tag(tag)
+        if tag and tag not in normalized:
+            if len(tag) > MAX_TAG_LENGTH:
+                raise ValueError(f"Tags must be at most {MAX_TAG_LENGTH} characters")
+            normalized.append(tag)
+    if len(normalized) > MAX_TAGS_PER_IDEA:
+        raise ValueError(f"At most {MAX_TAGS_PER_IDEA} tags per idea")
+    return normalized
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC, so every backend compares and sorts them alike"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
 class DrawingIdea(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     text: str = Field(..., min_length=1, max_length=200)
+    text_key: str = Field(default="")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     user_submitted: bool = Field(default=True)
+    tags: List[str] = Field(default_factory=list)
+
+    _normalize_tags = field_validator("tags")(normalize_tags)
+    _naive_created_at = field_validator("created_at")(to_naive_utc)
+
+    @model_validator(mode="after")
+    def fill_text_key(self):
+        if not self.text_key:
+            self.text_key = normalize_idea_text(self.text)
+        return self
 
 class DrawingIdeaCreate(BaseModel):
     text: str = Field(..., min_length=1, max_length=200)
+    tags: List[str] = Field(default_factory=list)
+
+    _normalize_tags = field_validator("tags")(normalize_tags)
 
 class DrawingIdeaResponse(BaseModel):
     id: str
     text: str
     created_at: datetime
-    user_submitted: bool
\ No newline at end of file
+    user_submitted: bool
+    tags: List[str] = []
+
+class DrawingIdeaPage(BaseModel):
+    items: List[DrawingIdeaResponse]
+    next_cursor: Optional[str] = None
+
+class DrawingIdeaBatchItemResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "invalid"]
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+class DrawingIdeaBatchResponse(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: List[DrawingIdeaBatchItemResult]
+
+class DrawingIdeaImportResponse(BaseModel):
+    imported: int
+    duplicates: int
+    invalid: int
+    errors: List[str]
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class PopularIdeaResponse(DrawingIdeaResponse):
+    served_count: int = 0
+    drawn_count: int = 0
+
+class DailyChallengeResponse(BaseModel):
+    date: str
+    timezone: str
+    idea: DrawingIdeaResponse
@@ -0,0 +1,122 @@
+import zlib
+from typing import AsyncIterator, Tuple
+
+import orjson
+
+# Flush output in chunks of roughly this many bytes
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Lines longer than this are rejected instead of buffered
+MAX_LINE_BYTES = 64 * 1024
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class NDJSONLineError(ValueError):
+    """A single import line could not be parsed"""
+
+
+def encode_line(doc: dict) -> bytes:
+    return orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def export_chunks(ideas: AsyncIterator[dict], compress: bool = False) -> AsyncIterator[bytes]:
+    """Turn a stream of ideas into NDJSON byte chunks, optionally gzip-compressed
+
+    Only one chunk is held in memory at a time; the source's batch size bounds
+    how many ideas are fetched ahead.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = bytearray()
+    try:
+        async for doc in ideas:
+            buffer += encode_line(doc)
+            if len(buffer) >= EXPORT_CHUNK_BYTES:
+                chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+                buffer.clear()
+                if chunk:
+                    yield chunk
+        tail = bytes(buffer)
+        if compressor:
+            tail = compressor.compress(tail) + compressor.flush()
+        if tail:
+            yield tail
+    finally:
+        await ideas.aclose()
+
+
+async def _decompressed(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Pass chunks through, inflating them in bounded pieces if the body is gzip"""
+    decompressor = None
+    first = True
+    async for chunk in stream:
+        if first and chunk:
+            first = False
+            if chunk[:2] == GZIP_MAGIC:
+                decompressor = zlib.decompressobj(wbits=31)
+        if decompressor is None:
+            yield chunk
+            continue
+        while chunk:
+            out = decompressor.decompress(chunk, MAX_LINE_BYTES)
+            if out:
+                yield out
+            chunk = decompressor.unconsumed_tail
+    if decompressor:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, object]]:
+    """Incrementally parse an NDJSON body into (line_number, object) pairs
+
+    Gzip input is detected from its magic bytes. Blank lines are skipped.
+    Unparseable or oversized lines yield (line_number, NDJSONLineError) so the
+    caller can report them without aborting the whole import.
+    """
+    pending = bytearray()
+    line_number = 0
+    skipping = False
+
+    async for chunk in _decompressed(stream):
+        pending += chunk
+        while True:
+            newline = pending.find(b"\n")
+            if newline < 0:
+                if len(pending) > MAX_LINE_BYTES:
+                    # Drop the oversized line now and ignore the rest of it
+                    if not skipping:
+                        line_number += 1
+                        skipping = True
+                        yield line_number, NDJSONLineError("Line too long")
+                    pending.clear()
+                break
+
+            raw = bytes(pending[:newline])
+            del pending[:newline + 1]
+            if skipping:
+                skipping = False
+                continue
+            line_number += 1
+            parsed = _parse_line(raw)
+            if parsed is not None:
+                yield line_number, parsed
+
+    if pending.strip() and not skipping:
+        line_number += 1
+        parsed = _parse_line(bytes(pending))
+        if parsed is not None:
+            yield line_number, parsed
+
+
+def _parse_line(raw: bytes):
+    if not raw.strip():
+        return None
+    try:
+        value = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return NDJSONLineError("Invalid JSON")
+    if not isinstance(value, dict):
+        return NDJSONLineError("Expected a JSON object")
+    return value
@@ -0,0 +1,206 @@
+"""Near-duplicate detection for idea texts: character shingles, MinHash and LSH
+
+Texts are reduced to words (ignoring case, punctuation and filler words such
+as "draw a"), cut into character shingles, and summarized by a one-permutation
+MinHash signature: every shingle is hashed once into one of NUM_BINS bins and
+each bin keeps its smallest hash, empty bins borrowing from their neighbour.
+Signatures are split into BANDS bands of ROWS values; ideas sharing any band
+land in the same LSH bucket and become candidates, which are then compared by
+exact Jaccard similarity of their shingle sets. Only ideas sharing at least
+MIN_SHARED_BANDS bands are verified.
+
+`python near_duplicates.py` scans the configured storage backend offline and
+prints clusters of near-duplicate ideas.
+"""
+import argparse
+import asyncio
+import zlib
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Union
+
+from search_index import tokenize
+
+SHINGLE_SIZE = 3
+BANDS = 16
+ROWS = 4
+NUM_BINS = BANDS * ROWS
+
+# Ideas sharing fewer bands are almost never similar enough; skipping them
+# avoids verifying dozens of chance collisions per lookup
+MIN_SHARED_BANDS = 2
+# Candidates sharing the most bands are verified first; the rest are skipped
+MAX_CANDIDATES = 50
+
+# Words too common in prompts to tell two ideas apart
+IGNORED_WORDS = frozenset({"a", "an", "the", "draw", "sketch", "paint", "of", "in", "on", "with", "at"})
+
+MASK64 = (1 << 64) - 1
+# Odd multiplier spreading 32-bit CRCs over 64 bits; the top bits pick the bin
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+BIN_SHIFT = 64 - (NUM_BINS - 1).bit_length()
+VALUE_MASK = (1 << BIN_SHIFT) - 1
+# Added per bin walked when an empty bin borrows a neighbour's value
+DENSIFY_OFFSET = 1 << BIN_SHIFT
+
+
+def shingles(text: str) -> Set[int]:
+    """Hashed character shingles of the text's significant words; empty when it has no words
+    (only emoji or punctuation), so such texts are never similar to anything"""
+    words = [word for word in tokenize(text) if word not in IGNORED_WORDS] or tokenize(text)
+    joined = " ".join(words)
+    if not joined:
+        return set()
+    return {
+        zlib.crc32(joined[start:start + SHINGLE_SIZE].encode())
+        for start in range(max(1, len(joined) - SHINGLE_SIZE + 1))
+    }
+
+
+def jaccard(first: Set[int], second: Set[int]) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def signature(hashes: Iterable[int]) -> List[int]:
+    """One-permutation MinHash with rotation densification"""
+    bins = [-1] * NUM_BINS
+    for value in hashes:
+        value = (value * HASH_MULTIPLIER) & MASK64
+        index, value = value >> BIN_SHIFT, value & VALUE_MASK
+        if bins[index] < 0 or value < bins[index]:
+            bins[index] = value
+    if -1 in bins and max(bins) >= 0:
+        for index in range(NUM_BINS):
+            distance = 1
+            while bins[index] < 0:
+                source = bins[(index + distance) % NUM_BINS]
+                if source >= 0 and source < DENSIFY_OFFSET:
+                    bins[index] = source + distance * DENSIFY_OFFSET
+                distance += 1
+    return bins
+
+
+def band_keys(hashes: Iterable[int]) -> List[int]:
+    bins = signature(hashes)
+    return [hash((band, *bins[band * ROWS:(band + 1) * ROWS])) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """LSH buckets over ideas identified by integer position
+
+    Only band keys are stored per idea; the texts of candidates are fetched
+    through `text_of` and re-shingled for the exact comparison. Memory is
+    roughly one dict entry per idea per band.
+    """
+
+    def __init__(self, text_of: Callable[[int], str]):
+        self._text_of = text_of
+        # band key -> position, or positions once several ideas share it
+        self._buckets: Dict[int, Union[int, List[int]]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, position: int, text: str):
+        hashes = shingles(text)
+        # Without shingles it can never match; counted so positions stay in step
+        self._count += 1
+        if not hashes:
+            return
+        for key in band_keys(hashes):
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = position
+            elif isinstance(bucket, list):
+                bucket.append(position)
+            else:
+                self._buckets[key] = [bucket, position]
+
+    def candidates(self, hashes: Set[int]) -> List[int]:
+        """Positions sharing at least MIN_SHARED_BANDS bands, most shared first"""
+        shared = Counter()
+        for key in band_keys(hashes):
+            bucket = self._buckets.get(key)
+            if isinstance(bucket, list):
+                shared.update(bucket)
+            elif bucket is not None:
+                shared[bucket] += 1
+        return [
+            position for position, count in shared.most_common(MAX_CANDIDATES)
+            if count >= MIN_SHARED_BANDS
+        ]
+
+    def find(self, text: str, threshold: float) -> List[Tuple[int, float]]:
+        """(position, similarity) of indexed ideas at least `threshold` similar, most similar first"""
+        hashes = shingles(text)
+        if not hashes:
+            return []
+        matches = []
+        for position in self.candidates(hashes):
+            similarity = jaccard(hashes, shingles(self._text_of(position)))
+            if similarity >= threshold:
+                matches.append((position, similarity))
+        matches.sort(key=lambda match: -match[1])
+        return matches
+
+
+async def find_clusters(repository, threshold: float) -> List[List[dict]]:
+    """Groups of two or more ideas linked by pairwise similarity >= `threshold`, largest first"""
+    ideas: List[dict] = []
+    index = NearDuplicateIndex(lambda position: ideas[position]["text"])
+    # Union-find over positions
+    parents: List[int] = []
+
+    def root(position: int) -> int:
+        while parents[position] != position:
+            parents[position] = parents[parents[position]]
+            position = parents[position]
+        return position
+
+    async for doc in repository.iter_ideas():
+        position = len(ideas)
+        ideas.append(doc)
+        parents.append(position)
+        for match, _ in index.find(doc["text"], threshold):
+            parents[root(match)] = root(position)
+        index.add(position, doc["text"])
+
+    clusters: Dict[int, List[dict]] = {}
+    for position, doc in enumerate(ideas):
+        clusters.setdefault(root(position), []).append(doc)
+    return sorted(
+        (members for members in clusters.values() if len(members) > 1),
+        key=lambda members: -len(members)
+    )
+
+
+if __name__ == "__main__":
+    from pathlib import Path
+
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).parent / '.env')
+
+    from storage import create_repository
+
+    parser = argparse.ArgumentParser(description="Report clusters of near-duplicate ideas")
+    parser.add_argument("--threshold", type=float, default=0.6, help="minimum similarity (0-1)")
+    args = parser.parse_args()
+
+    async def main():
+        repository = create_repository()
+        await repository.setup()
+        try:
+            clusters = await find_clusters(repository, args.threshold)
+        finally:
+            await repository.close()
+        for members in clusters:
+            print(f"{len(members)} similar ideas:")
+            for doc in members:
+                print(f"  {doc['id']}  {doc['text']}")
+        duplicates = sum(len(members) - 1 for members in clusters)
+        print(f"{len(clusters)} clusters, {duplicates} ideas that duplicate another")
+
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from models import to_naive_utc
+
+# Sort order shared by the list endpoint and its supporting compound index
+IDEA_SORT = [("created_at", -1), ("id", -1)]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(created_at: datetime, idea_id: str) -> str:
+    """Encode the (created_at, id) position of the last row as an opaque token"""
+    payload = json.dumps({"c": created_at.isoformat(), "i": idea_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a token produced by encode_cursor back into (created_at, id)
+
+    Timestamps with an offset (hand-made or re-encoded cursors) are
+    converted to naive UTC, like every stored timestamp.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return to_naive_utc(datetime.fromisoformat(payload["c"])), str(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
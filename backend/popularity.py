@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PopularityCounters:
+    """Write-behind serve/"drawn" counters, aggregated per idea in memory
+
+    Hits only touch a dict; a background task hands the accumulated deltas
+    to the repository every `flush_interval_seconds` as one unordered bulk
+    write, and a final flush runs at shutdown. A crash loses at most one
+    interval. At most `max_pending` distinct ideas are buffered between
+    flushes; hits for further ideas are dropped.
+    """
+
+    def __init__(self, flush_interval_seconds: float = 10.0, max_pending: int = 100000):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        # idea id -> deltas in models.IDEA_COUNTER_FIELDS order: [served, drawn]
+        self._pending: Dict[str, List[int]] = {}
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _add(self, idea_id: str, field: int, amount: int = 1):
+        deltas = self._pending.get(idea_id)
+        if deltas is None:
+            if len(self._pending) >= self.max_pending:
+                return
+            deltas = self._pending[idea_id] = [0, 0]
+        deltas[field] += amount
+
+    def record_served(self, idea_ids: Iterable[str]):
+        for idea_id in idea_ids:
+            self._add(idea_id, 0)
+
+    def record_drawn(self, idea_id: str):
+        self._add(idea_id, 1)
+
+    async def flush(self, repository) -> int:
+        """Write pending deltas; returns how many ideas were updated"""
+        async with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            try:
+                await repository.increment_counters(pending)
+            except Exception:
+                # Keep the deltas for the next attempt, merged with hits since the swap
+                for idea_id, (served, drawn) in pending.items():
+                    self._add(idea_id, 0, served)
+                    self._add(idea_id, 1, drawn)
+                raise
+            return len(pending)
+
+    def start(self, repository):
+        """Flush in the background every interval"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._run(repository))
+
+    async def _run(self, repository):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self.flush(repository)
+            except Exception as e:
+                logger.error(f"Error flushing popularity counters: {e}")
+
+    async def close(self, repository):
+        """Stop the background task and write what is left"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            flushed = await self.flush(repository)
+            if flushed:
+                logger.info(f"Flushed popularity counters for {flushed} ideas")
+        except Exception as e:
+            logger.error(f"Error flushing popularity counters: {e}")
@@ -0,0 +1,136 @@
+"""Opt-in per-request profiling
+
+A request is profiled when it carries `X-Profile: <PROFILE_SECRET>` or is
+picked by PROFILE_SAMPLE_RATE, and its path starts with one of
+PROFILE_PATHS. Profiles are written to PROFILE_DIR, keeping the newest
+PROFILE_KEEP files, and the file name is returned in `X-Profile-File`.
+
+pyinstrument is used when installed: its async mode follows the request's
+task across await points, so time spent waiting on Motor shows up under the
+awaiting frame, and output is speedscope JSON. Otherwise cProfile writes a
+.pstats file; note that cProfile sees everything running on the event loop
+thread while the request is in flight, not just this request.
+
+When neither a secret nor a sample rate is configured the middleware is not
+installed at all.
+"""
+import asyncio
+import cProfile
+import hmac
+import logging
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:  # pragma: no cover - optional dependency
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value
+    return None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware wrapping opted-in requests in a profiler"""
+
+    def __init__(
+        self,
+        app,
+        directory: str,
+        secret: str = "",
+        sample_rate: float = 0.0,
+        keep: int = 50,
+        paths: Iterable[str] = ("/api/ideas",),
+        excluded_paths: Iterable[str] = ("/api/ideas/stream",),
+    ):
+        self.app = app
+        self.directory = Path(directory)
+        self.secret = secret.encode()
+        self.sample_rate = sample_rate
+        self.keep = keep
+        self.paths = tuple(paths)
+        # Long-lived responses (the SSE stream) would keep a profiler running for their whole life
+        self.excluded_paths = tuple(path for path in excluded_paths if path)
+
+    def _opted_in(self, scope) -> bool:
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            return False
+        if scope["path"].startswith(self.excluded_paths):
+            return False
+        if self.secret:
+            token = _header(scope, PROFILE_HEADER)
+            if token is not None and hmac.compare_digest(token, self.secret):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self._opted_in(scope):
+            await self.app(scope, receive, send)
+            return
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        suffix = ".speedscope.json" if Profiler else ".pstats"
+        filename = f"{stamp}-{scope['method'].lower()}-{slug}{suffix}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", filename.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        start = time.perf_counter()
+        if Profiler:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profiler.stop()
+                output = profiler.output(renderer=SpeedscopeRenderer())
+                await self._save(filename, output.encode(), time.perf_counter() - start)
+        else:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                profile.disable()
+                await self._save(filename, profile, time.perf_counter() - start)
+
+    async def _save(self, filename: str, data, elapsed: float):
+        try:
+            await asyncio.to_thread(self._write, filename, data)
+            logger.info(f"Saved profile {filename} ({elapsed * 1000:.1f} ms)")
+        except Exception as e:
+            logger.error(f"Error saving profile {filename}: {e}")
+
+    def _write(self, filename: str, data):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / filename
+        if isinstance(data, bytes):
+            path.write_bytes(data)
+        else:
+            data.dump_stats(str(path))
+
+        # Rotate: keep only the newest files
+        profiles = sorted(
+            (p for p in self.directory.iterdir() if p.is_file()),
+            key=lambda p: p.name
+        )
+        for stale in profiles[:-self.keep] if self.keep > 0 else []:
+            stale.unlink(missing_ok=True)
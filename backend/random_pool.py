@@ -0,0 +1,291 @@
+import asyncio
+import bisect
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from near_duplicates import NearDuplicateIndex
+from search_index import TokenIndex
+from seeding import SEED_NAME
+
+logger = logging.getLogger(__name__)
+
+# Compact row kept per idea: (id, text, created_at, user_submitted, tags)
+IdeaRecord = Tuple[str, str, datetime, bool, Tuple[str, ...]]
+
+# Incremental refreshes re-read this much history before the newest idea seen,
+# so inserts from other replicas with slightly older timestamps are not missed
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+# Ideas signed per slice while the near-duplicate index catches up in the background
+NEAR_DUPLICATE_CHUNK = 500
+# Lookups sign at most this many pending ideas inline; beyond that they report "cold"
+NEAR_DUPLICATE_INLINE_BACKLOG = 100
+
+
+def _to_record(doc: dict) -> IdeaRecord:
+    return (
+        doc["id"], doc["text"], doc["created_at"], doc.get("user_submitted", True),
+        tuple(doc.get("tags") or ())
+    )
+
+
+def _to_dict(record: IdeaRecord) -> dict:
+    idea_id, text, created_at, user_submitted, tags = record
+    return {
+        "id": idea_id, "text": text, "created_at": created_at,
+        "user_submitted": user_submitted, "tags": list(tags),
+    }
+
+
+class RandomIdeaPool:
+    """Process-local copy of the idea corpus serving random picks in O(1)
+
+    The pool is loaded once, extended in place when this process creates an
+    idea, and topped up from Mongo in the background once it is older than
+    `max_age_seconds` so ideas written by other replicas show up with bounded
+    staleness. Until the first load finishes the pool is "cold" and callers
+    are expected to fall back to the repository. Tags are only ever added to
+    existing ideas, by the default-idea sync; when its stored fingerprint
+    changes, the next top-up re-reads the whole corpus to pick them up.
+
+    With `detect_near_duplicates`, ideas are also signed into a MinHash/LSH
+    index; signing the whole corpus takes a while, so it runs in slices in
+    the background after each load.
+    """
+
+    def __init__(self, max_age_seconds: float = 60.0, detect_near_duplicates: bool = False):
+        self.max_age_seconds = max_age_seconds
+        self._records: List[IdeaRecord] = []
+        # idea id -> position in _records
+        self._ids: Dict[str, int] = {}
+        # tag -> positions in _records, in arrival order
+        self._by_tag: Dict[str, List[int]] = {}
+        # word prefix -> positions, for autocomplete
+        self._token_index = TokenIndex()
+        # near-copies of a text, by position; covers a prefix of _records
+        self._near_duplicates: Optional[NearDuplicateIndex] = None
+        if detect_near_duplicates:
+            self._near_duplicates = NearDuplicateIndex(lambda position: self._records[position][1])
+        self._near_duplicate_task: Optional[asyncio.Task] = None
+        # (created_at, id, position) in ascending order, rebuilt when ideas were added
+        self._sorted: List[Tuple[datetime, str, int]] = []
+        self._watermark: Optional[datetime] = None
+        # Default-idea sync the tags in the pool reflect
+        self._seed_fingerprint: Optional[str] = None
+        self._refreshed_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def is_warm(self) -> bool:
+        return self._refreshed_at is not None
+
+    @property
+    def is_stale(self) -> bool:
+        if self._refreshed_at is None:
+            return True
+        return time.monotonic() - self._refreshed_at > self.max_age_seconds
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        """Seconds since the pool last caught up with the repository, None when cold"""
+        if self._refreshed_at is None:
+            return None
+        return time.monotonic() - self._refreshed_at
+
+    def pick(self) -> Optional[dict]:
+        """Return a random idea, or None when the pool is cold or empty"""
+        if not self.is_warm or not self._records:
+            return None
+        return _to_dict(random.choice(self._records))
+
+    def _members(self, tag: Optional[str]) -> Tuple[int, Callable[[int], IdeaRecord]]:
+        """Size of the whole pool, or of one tag's pool, and a lookup by position in it"""
+        if tag is None:
+            return len(self._records), self._records.__getitem__
+        positions = self._by_tag.get(tag, ())
+        return len(positions), lambda position: self._records[positions[position]]
+
+    def size(self, tag: Optional[str] = None, exclude: Set[str] = frozenset()) -> int:
+        """Ideas in the pool (or tag pool), not counting those in `exclude`"""
+        return self._members(tag)[0] - self._excluded(exclude, tag)
+
+    def _excluded(self, exclude: Set[str], tag: Optional[str]) -> int:
+        return sum(
+            1 for idea_id in exclude
+            if idea_id in self._ids and (tag is None or tag in self._records[self._ids[idea_id]][4])
+        )
+
+    def sample(self, count: int, exclude: Set[str] = frozenset(), tag: Optional[str] = None) -> Optional[List[dict]]:
+        """Up to `count` distinct random ideas not in `exclude` (and tagged `tag`),
+        or None when the pool is cold or empty"""
+        if not self.is_warm or not self._records:
+            return None
+        size, at = self._members(tag)
+        want = min(count, size - self._excluded(exclude, tag))
+        if want <= 0:
+            return []
+
+        # Rejection sampling stays O(count) while most of the pool is eligible
+        if (want + len(exclude)) * 2 <= size:
+            picked = {}
+            while len(picked) < want:
+                record = at(random.randrange(size))
+                if record[0] not in exclude:
+                    picked[record[0]] = record
+            return [_to_dict(record) for record in picked.values()]
+
+        eligible = [record for record in map(at, range(size)) if record[0] not in exclude]
+        return [_to_dict(record) for record in random.sample(eligible, want)]
+
+    def get(self, index: int, tag: Optional[str] = None) -> dict:
+        """Idea at a stable position in the pool (or tag pool); positions only grow as ideas are added"""
+        return _to_dict(self._members(tag)[1](index))
+
+    def lookup(self, idea_id: str) -> Optional[dict]:
+        """The idea with this id, or None when the pool has not seen it"""
+        position = self._ids.get(idea_id)
+        return None if position is None else _to_dict(self._records[position])
+
+    def ids(self) -> List[str]:
+        """Ids of every idea in the pool, in arrival order"""
+        return [record[0] for record in self._records]
+
+    def complete(self, prefix: str, limit: int) -> Optional[List[dict]]:
+        """Up to `limit` ideas whose words start with each word of `prefix`, or None when cold"""
+        if not self.is_warm:
+            return None
+        return [_to_dict(self._records[position]) for position in self._token_index.search(prefix, limit)]
+
+    def list_ideas(
+        self, limit: int, after: Optional[Tuple[datetime, str]] = None, tag: Optional[str] = None
+    ) -> Optional[List[dict]]:
+        """Like IdeaRepository.list_ideas, from the pool; None when cold"""
+        if not self.is_warm:
+            return None
+        if len(self._sorted) != len(self._records):
+            self._sorted = sorted(
+                (record[2], record[0], position) for position, record in enumerate(self._records)
+            )
+        end = bisect.bisect_left(self._sorted, after) if after else len(self._sorted)
+        ideas = []
+        for index in range(end - 1, -1, -1):
+            if len(ideas) >= limit:
+                break
+            position = self._sorted[index][2]
+            if tag is None or tag in self._records[position][4]:
+                ideas.append(_to_dict(self._records[position]))
+        return ideas
+
+    def tag_counts(self) -> Optional[Dict[str, int]]:
+        """Number of ideas per tag, from the pool; None when cold"""
+        if not self.is_warm:
+            return None
+        return {tag: len(positions) for tag, positions in self._by_tag.items()}
+
+    def near_duplicates(self, text: str, threshold: float) -> Optional[List[Tuple[dict, float]]]:
+        """Ideas at least `threshold` similar to `text` with their similarity, most similar
+        first; None when detection is off, the pool is cold or the index is still loading"""
+        index = self._near_duplicates
+        if index is None or not self.is_warm:
+            return None
+        if len(self._records) - len(index) > NEAR_DUPLICATE_INLINE_BACKLOG:
+            return None
+        self._sign_pending(len(self._records))
+        return [(_to_dict(self._records[position]), similarity) for position, similarity in index.find(text, threshold)]
+
+    def _sign_pending(self, end: int):
+        index = self._near_duplicates
+        for position in range(len(index), end):
+            index.add(position, self._records[position][1])
+
+    def _schedule_signing(self):
+        if self._near_duplicates is None or len(self._near_duplicates) >= len(self._records):
+            return
+        if self._near_duplicate_task and not self._near_duplicate_task.done():
+            return
+        self._near_duplicate_task = asyncio.create_task(self._sign_in_background())
+
+    async def _sign_in_background(self):
+        index = self._near_duplicates
+        try:
+            while len(index) < len(self._records):
+                self._sign_pending(min(len(index) + NEAR_DUPLICATE_CHUNK, len(self._records)))
+                await asyncio.sleep(0)
+        except Exception as e:
+            logger.error(f"Error building near-duplicate index: {e}")
+
+    def _merge_tags(self, position: int, tags):
+        """Add tags an idea gained since it was loaded; positions join the end of their tag pools"""
+        record = self._records[position]
+        added = tuple(tag for tag in tags or () if tag not in record[4])
+        if not added:
+            return
+        self._records[position] = record[:4] + (record[4] + added,)
+        for tag in added:
+            self._by_tag.setdefault(tag, []).append(position)
+
+    def _append(self, doc: dict) -> Optional[int]:
+        """Position of a newly added idea; None (after merging its tags) for one already known"""
+        if doc["id"] in self._ids:
+            self._merge_tags(self._ids[doc["id"]], doc.get("tags"))
+            return None
+        position = len(self._records)
+        record = _to_record(doc)
+        self._ids[doc["id"]] = position
+        for tag in record[4]:
+            self._by_tag.setdefault(tag, []).append(position)
+        self._records.append(record)
+        if self._watermark is None or doc["created_at"] > self._watermark:
+            self._watermark = doc["created_at"]
+        return position
+
+    def add(self, doc: dict):
+        """Add an idea written by this process"""
+        position = self._append(doc)
+        if position is not None:
+            self._token_index.add(position, doc["text"])
+            self._schedule_signing()
+
+    async def refresh(self, repository):
+        """Load the full corpus when cold or re-tagged by a default-idea sync,
+        otherwise fetch only ideas newer than the watermark"""
+        async with self._lock:
+            seed_state = await repository.get_seed_state(SEED_NAME)
+            seed_fingerprint = seed_state["fingerprint"] if seed_state else None
+            since = None
+            if self.is_warm and self._watermark is not None and seed_fingerprint == self._seed_fingerprint:
+                since = self._watermark - REFRESH_OVERLAP
+
+            added = []
+            async for doc in repository.iter_ideas(since=since):
+                position = self._append(doc)
+                if position is not None:
+                    added.append((position, doc["text"]))
+            # One merge for the whole batch rather than an insert per word
+            self._token_index.extend(added)
+            self._schedule_signing()
+
+            if not self.is_warm:
+                logger.info(f"Random idea pool loaded with {len(self._records)} ideas")
+            self._seed_fingerprint = seed_fingerprint
+            self._refreshed_at = time.monotonic()
+            return added
+
+    def schedule_refresh(self, repository):
+        """Start a background refresh if the pool is stale and none is running"""
+        if not self.is_stale or (self._refresh_task and not self._refresh_task.done()):
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_quietly(repository))
+
+    async def _refresh_quietly(self, repository):
+        try:
+            await self.refresh(repository)
+        except Exception as e:
+            logger.error(f"Error refreshing random idea pool: {e}")
@@ -0,0 +1,144 @@
+import bisect
+import heapq
+import re
+from array import array
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from models import normalize_idea_text
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Entries per block of the sorted token list; blocks split at twice this size
+BLOCK_SIZE = 512
+
+# Multi-word queries whose runs hold at most this many entries in total are
+# answered by intersecting position sets instead of checking candidates one by one
+INTERSECT_MAX_ENTRIES = 65536
+
+# Sorts past the end of every token sharing a prefix
+PREFIX_END = "\U0010ffff"
+
+
+def tokenize(text: str) -> List[str]:
+    """Words of the normalized (casefolded, NFKC) text"""
+    return TOKEN_PATTERN.findall(normalize_idea_text(text))
+
+
+class TokenIndex:
+    """Sorted token -> pool position index answering prefix queries
+
+    (token, position) entries are kept sorted in blocks of about BLOCK_SIZE,
+    so adding an idea moves a few hundred entries rather than the whole list,
+    and the ideas whose words start with a prefix form one contiguous run
+    found with two bisects. A query matches ideas having, for every query
+    word, a word starting with it. Small runs are intersected as sets;
+    otherwise the run of the rarest query word is scanned and the other words
+    are checked against each candidate's text, stopping at the limit.
+    """
+
+    def __init__(self):
+        self._tokens: List[List[str]] = [[]]
+        self._positions: List[array] = [array("l")]
+        # First token of every block, for finding the block to search
+        self._firsts: List[str] = [""]
+        # position -> " word word ...", so "starts a word" is a substring test
+        self._texts: Dict[int, str] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, position: int, text: str):
+        self.extend([(position, text)])
+
+    def extend(self, items: Iterable[Tuple[int, str]]):
+        """Index ideas by pool position; positions already indexed are skipped"""
+        entries = []
+        for position, text in items:
+            if position in self._texts:
+                continue
+            tokens = set(tokenize(text))
+            self._texts[position] = " " + " ".join(tokens)
+            entries.extend((token, position) for token in tokens)
+
+        if len(entries) > self._size // 4:
+            # Large loads (the first refresh): one sort beats inserting one by one
+            self._rebuild(entries)
+        else:
+            for token, position in entries:
+                self._insert(token, position)
+        self._size += len(entries)
+
+    def _rebuild(self, entries: List[Tuple[str, int]]):
+        merged = [entry for block in zip(self._tokens, self._positions) for entry in zip(*block)]
+        merged.extend(entries)
+        merged.sort(key=lambda entry: entry[0])
+        chunks = [merged[start:start + BLOCK_SIZE] for start in range(0, len(merged), BLOCK_SIZE)] or [[]]
+        self._tokens = [[token for token, _ in chunk] for chunk in chunks]
+        self._positions = [array("l", (position for _, position in chunk)) for chunk in chunks]
+        self._firsts = [tokens[0] if tokens else "" for tokens in self._tokens]
+
+    def _insert(self, token: str, position: int):
+        block = max(0, bisect.bisect_right(self._firsts, token) - 1)
+        tokens, positions = self._tokens[block], self._positions[block]
+        index = bisect.bisect_right(tokens, token)
+        tokens.insert(index, token)
+        positions.insert(index, position)
+        if index == 0:
+            self._firsts[block] = token
+        if len(tokens) > 2 * BLOCK_SIZE:
+            self._tokens[block + 1:block + 1] = [tokens[BLOCK_SIZE:]]
+            self._positions[block + 1:block + 1] = [positions[BLOCK_SIZE:]]
+            self._firsts.insert(block + 1, tokens[BLOCK_SIZE])
+            del tokens[BLOCK_SIZE:], positions[BLOCK_SIZE:]
+
+    def _locate(self, token: str) -> Tuple[int, int]:
+        """(block, index) of the first entry not sorting before `token`"""
+        # A common token can fill several blocks: start before the first of them
+        block = max(0, bisect.bisect_left(self._firsts, token) - 1)
+        index = bisect.bisect_left(self._tokens[block], token)
+        if index == len(self._tokens[block]) and block + 1 < len(self._tokens):
+            return block + 1, 0
+        return block, index
+
+    def _run(self, prefix: str) -> Tuple[int, int, int, int, int]:
+        """How many entries start with `prefix`, then the (block, index) bounds of the run"""
+        start_block, start = self._locate(prefix)
+        end_block, end = self._locate(prefix + PREFIX_END)
+        size = end - start + sum(len(self._tokens[block]) for block in range(start_block, end_block))
+        return size, start_block, start, end_block, end
+
+    def _scan(self, run) -> Iterator[int]:
+        _, start_block, start, end_block, end = run
+        for block in range(start_block, end_block + 1):
+            positions = self._positions[block]
+            yield from positions[
+                start if block == start_block else 0:
+                end if block == end_block else len(positions)
+            ]
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Positions of up to `limit` ideas matching every word of `query` as a prefix, in no set order"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        runs = sorted((self._run(term), term) for term in terms)
+        if len(runs) > 1 and sum(run[0] for run, _ in runs) <= INTERSECT_MAX_ENTRIES:
+            matches = set(self._scan(runs[0][0]))
+            for run, _ in runs[1:]:
+                matches.intersection_update(self._scan(run))
+            return heapq.nlargest(limit, matches)
+
+        others = [" " + term for _, term in runs[1:]]
+
+        found, seen = [], set()
+        for position in self._scan(runs[0][0]):
+            if position in seen:
+                continue
+            seen.add(position)
+            text = self._texts[position]
+            if all(term in text for term in others):
+                found.append(position)
+                if len(found) >= limit:
+                    break
+        return found
@@ -0,0 +1,91 @@
+"""Incremental, multi-worker-safe sync of DEFAULT_DRAWING_IDEAS
+
+The default list is fingerprinted and compared with the seed state stored
+next to the ideas. When it changed, one worker takes a lease and upserts
+only the defaults added (or re-tagged) since the last sync, keyed on
+normalized text, so edits to data.py reach existing deployments without
+duplicates. Tags are merged into existing ideas, never removed. Workers
+that find the fingerprint current, or the lease taken, return immediately;
+none of this depends on how many ideas are stored.
+
+Defaults removed from data.py are left in place: by then they are ordinary
+ideas that may already be scheduled or shown.
+"""
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models import DrawingIdea, normalize_idea_text, normalize_tags
+
+logger = logging.getLogger(__name__)
+
+SEED_NAME = "default_ideas"
+
+
+def seed_fingerprint(texts: List[str], tags: Optional[Dict[str, List[str]]] = None) -> str:
+    """Stable hash of the default idea list and its tags"""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode())
+        for tag in (tags or {}).get(text, ()):
+            digest.update(b"\x1f" + tag.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _applied_entries(state: Optional[dict]) -> Dict[str, List[str]]:
+    """text_key -> tags from a stored seed state (older states list bare keys)"""
+    applied = {}
+    for entry in state["keys"] if state else ():
+        if isinstance(entry, str):
+            applied[entry] = []
+        else:
+            applied[entry[0]] = list(entry[1])
+    return applied
+
+
+async def sync_default_ideas(
+    repository,
+    texts: List[str],
+    owner: str,
+    lease_seconds: float = 60.0,
+    tags: Optional[Dict[str, List[str]]] = None
+) -> int:
+    """Bring the stored defaults in line with `texts` (and `tags`); returns how many were written"""
+    fingerprint = seed_fingerprint(texts, tags)
+    state = await repository.get_seed_state(SEED_NAME)
+    if state and state["fingerprint"] == fingerprint:
+        return 0
+
+    if not await repository.acquire_lease(SEED_NAME, owner, lease_seconds):
+        logger.info("Default ideas are being synced by another worker")
+        return 0
+
+    try:
+        # Another worker may have finished the sync before we got the lease
+        state = await repository.get_seed_state(SEED_NAME)
+        if state and state["fingerprint"] == fingerprint:
+            return 0
+
+        applied = _applied_entries(state)
+        now = datetime.utcnow()
+        entries, pending = {}, []
+        for text in texts:
+            key = normalize_idea_text(text)
+            if key in entries:
+                continue
+            entries[key] = normalize_tags((tags or {}).get(text, []))
+            if applied.get(key) != entries[key]:
+                pending.append(
+                    DrawingIdea(text=text, tags=entries[key], user_submitted=False, created_at=now)
+                )
+
+        inserted = await repository.upsert_ideas(pending)
+        await repository.save_seed_state(
+            SEED_NAME, fingerprint, [[key, idea_tags] for key, idea_tags in entries.items()]
+        )
+        logger.info(f"Synced default ideas: {len(pending)} new or re-tagged, {inserted} inserted")
+        return len(pending)
+    finally:
+        await repository.release_lease(SEED_NAME, owner)
@@ -1,24 +1,158 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Body, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import ValidationError
 import os
 import logging
+import math
+import socket
+import time
+import uuid
+import orjson
 from pathlib import Path
-from typing import List
+from typing import Any, List, Literal, Optional, Union
 import random
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from models import DrawingIdea, DrawingIdeaCreate, DrawingIdeaResponse
-from data import DEFAULT_DRAWING_IDEAS
+from models import (
+    IDEA_RESPONSE_FIELDS,
+    DrawingIdea, DrawingIdeaCreate, DrawingIdeaResponse, DrawingIdeaPage,
+    DrawingIdeaBatchItemResult, DrawingIdeaBatchResponse, DrawingIdeaImportResponse,
+    DailyChallengeResponse, PopularIdeaResponse, TagCount, normalize_tag
+)
+from data import DEFAULT_DRAWING_IDEAS, DEFAULT_IDEA_TAGS
+from storage import DuplicateIdeaError, create_repository
+from seeding import sync_default_ideas
+import metrics
+from profiling import ProfilingMiddleware
+from random_pool import RandomIdeaPool
+from circuit_breaker import CircuitBreaker, UnavailableError
+from idea_stream import IdeaStreamHub, TooManySubscribersError
+from popularity import PopularityCounters
+from write_buffer import IdeaWriteBuffer
+from shuffle_bag import ShuffleBagStore
+from daily import DailyChallengeSchedule, next_midnight
+from list_cache import CollectionVersion, SerializedBodyCache, etag_for, etag_matches
+from ndjson_io import NDJSONLineError, export_chunks, iter_lines
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError, encode_cursor, decode_cursor
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Request and MongoDB command metrics, exposed at /metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Opt-in request profiling: X-Profile header matching the secret, or random sampling
+PROFILE_SECRET = os.environ.get('PROFILE_SECRET', '')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+
+# Idea storage (MongoDB by default; see STORAGE_BACKEND)
+repository = create_repository(
+    mongo_event_listeners=metrics.mongo_listeners() if METRICS_ENABLED else None
+)
+
+# Deadline on every storage call, and a circuit breaker that stops calling a
+# failing database for a while; reads are then served from the in-memory pool
+database_breaker = CircuitBreaker(
+    "database",
+    failure_threshold=int(os.environ.get('DB_BREAKER_FAILURES', '5')),
+    reset_seconds=float(os.environ.get('DB_BREAKER_RESET_SECONDS', '30')),
+    timeout_seconds=float(os.environ.get('DB_CALL_TIMEOUT_SECONDS', '6')),
+    failures=repository.unavailable_errors
+)
+
+# Ideas returned by GET /ideas in plain-array mode
+LIST_ALL_LIMIT = 1000
+
+# What POST /ideas does with a submission this similar to an existing idea:
+# "reject" (409), "flag" (accept, naming the match in X-Near-Duplicate-Of) or "off"
+NEAR_DUPLICATE_MODE = os.environ.get('NEAR_DUPLICATE_MODE', 'flag')
+# Jaccard similarity of character shingles, 0-1
+NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', '0.6'))
+
+# Process-local pool serving /ideas/random without a database round trip
+random_pool = RandomIdeaPool(
+    max_age_seconds=float(os.environ.get('RANDOM_POOL_MAX_AGE_SECONDS', '60')),
+    detect_near_duplicates=NEAR_DUPLICATE_MODE != 'off'
+)
+
+# Upper bounds for /ideas/random?count=&exclude= prefetching
+RANDOM_MAX_COUNT = int(os.environ.get('RANDOM_MAX_COUNT', '50'))
+RANDOM_MAX_EXCLUDE = int(os.environ.get('RANDOM_MAX_EXCLUDE', '500'))
+
+# Per-session draw-without-replacement state for /ideas/random?session=; held by
+# this worker only, so sessions need sticky routing across workers
+shuffle_bags = ShuffleBagStore(
+    ttl_seconds=float(os.environ.get('SHUFFLE_SESSION_TTL_SECONDS', '3600')),
+    max_sessions=int(os.environ.get('SHUFFLE_MAX_SESSIONS', '100000'))
+)
+
+# Fan-out of new ideas to /ideas/stream subscribers
+idea_stream = IdeaStreamHub(
+    queue_size=int(os.environ.get('IDEA_STREAM_QUEUE_SIZE', '64')),
+    max_subscribers=int(os.environ.get('IDEA_STREAM_MAX_SUBSCRIBERS', '10000')),
+    heartbeat_seconds=float(os.environ.get('IDEA_STREAM_HEARTBEAT_SECONDS', '15')),
+    max_stream_seconds=float(os.environ.get('IDEA_STREAM_MAX_SECONDS', '300'))
+)
+# Feed the stream from a MongoDB change stream so every replica sees every insert
+IDEA_STREAM_CHANGE_STREAMS = os.environ.get('IDEA_STREAM_CHANGE_STREAMS', 'false').lower() in ('1', 'true', 'yes')
+
+# Group commit for POST /ideas: submissions arriving within IDEA_WRITE_BUFFER_DELAY_MS
+# of each other (up to IDEA_WRITE_BUFFER_MAX_BATCH) are written with one insert_many
+IDEA_WRITE_BUFFER = os.environ.get('IDEA_WRITE_BUFFER', 'false').lower() in ('1', 'true', 'yes')
+write_buffer = IdeaWriteBuffer(
+    max_batch=int(os.environ.get('IDEA_WRITE_BUFFER_MAX_BATCH', '100')),
+    max_delay_seconds=float(os.environ.get('IDEA_WRITE_BUFFER_DELAY_MS', '5')) / 1000,
+    max_pending=int(os.environ.get('IDEA_WRITE_BUFFER_MAX_PENDING', '10000'))
+)
+
+# Serve / "drawn" counters, written behind every POPULARITY_FLUSH_SECONDS
+popularity = PopularityCounters(
+    flush_interval_seconds=float(os.environ.get('POPULARITY_FLUSH_SECONDS', '10'))
+)
+TOP_IDEAS_MAX_LIMIT = 100
+
+# Upper bound for /ideas/search?limit=
+SEARCH_MAX_LIMIT = 50
+
+# "Challenge of the Day" schedule, stored so every worker serves the same one
+daily_schedule = DailyChallengeSchedule(
+    horizon_days=int(os.environ.get('DAILY_SCHEDULE_DAYS', '30'))
+)
+
+# Version of drawing_ideas backing the ETag of GET /ideas, and the body cached for it
+ideas_version = CollectionVersion(
+    "drawing_ideas",
+    sync_interval_seconds=float(os.environ.get('IDEAS_VERSION_SYNC_SECONDS', '1'))
+)
+list_body_cache = SerializedBodyCache()
+
+# Identifies this worker when taking leases shared with other workers
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# How long one worker may hold the default-idea seeding lease
+SEED_LEASE_SECONDS = float(os.environ.get('SEED_LEASE_SECONDS', '60'))
+
+# How long readiness probes reuse the estimated idea count
+HEALTH_COUNT_TTL_SECONDS = float(os.environ.get('HEALTH_COUNT_TTL_SECONDS', '30'))
+_ideas_count_cache = {"value": None, "expires_at": 0.0}
+
+# How long GET /tags reuses the per-tag counts
+TAG_COUNTS_TTL_SECONDS = float(os.environ.get('TAG_COUNTS_TTL_SECONDS', '60'))
+_tag_counts_cache = {"value": None, "expires_at": 0.0}
+
+# Upper bound on the number of ideas accepted by one batch request
+IDEA_BATCH_MAX_SIZE = int(os.environ.get('IDEA_BATCH_MAX_SIZE', '5000'))
+
+# Documents fetched per cursor batch when exporting, and written per bulk insert when importing
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', '1000'))
+
+# Import errors echoed back in the response; the rest are only counted
+MAX_REPORTED_IMPORT_ERRORS = 20
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -26,88 +160,380 @@ app = FastAPI()
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+async def database(operation):
+    """Await a storage call through the circuit breaker; raises UnavailableError"""
+    return await database_breaker.call(operation)
+
+def unavailable(retry_after: float, detail: str = "Database unavailable") -> HTTPException:
+    return HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(math.ceil(retry_after))})
+
+def snapshot_headers() -> dict:
+    """Marks a response served from the in-memory pool while the database is unavailable"""
+    return {"X-Snapshot-Age": str(int(random_pool.age_seconds or 0))}
+
+def refresh_pool():
+    """Top up the pool in the background, unless the database is known to be down"""
+    if not database_breaker.is_open:
+        random_pool.schedule_refresh(repository)
+
+async def bump_ideas_version():
+    """Invalidate cached idea lists after a write"""
+    try:
+        await database(ideas_version.bump(repository))
+    except Exception as e:
+        logger.error(f"Error bumping ideas version: {e}")
+
+def announce_new_ideas(ideas: List[DrawingIdea], bulk: bool = False):
+    """Push new ideas to /ideas/stream subscribers, unless a change stream already does
+
+    Submissions get an `idea` event each, even when written as a group;
+    `bulk` additions (batch, import) of several ideas get one `count` event.
+    """
+    if idea_stream.uses_change_stream or not ideas:
+        return
+    if bulk and len(ideas) > 1:
+        idea_stream.publish_count(len(ideas))
+        return
+    for idea in ideas:
+        idea_stream.publish_idea({field: getattr(idea, field) for field in IDEA_RESPONSE_FIELDS})
+
 # Seed default ideas on startup
 async def seed_default_ideas():
-    """Seed the database with default drawing ideas if not already present"""
+    """Sync the default drawing ideas into the database when data.py changed"""
     try:
-        # Check if we already have ideas
-        existing_count = await db.drawing_ideas.count_documents({})
-        if existing_count > 0:
-            return
-        
-        # Insert default ideas
-        default_ideas = []
-        for idea_text in DEFAULT_DRAWING_IDEAS:
-            idea = DrawingIdea(
-                text=idea_text,
-                user_submitted=False,
-                created_at=datetime.utcnow()
-            )
-            default_ideas.append(idea.dict())
-        
-        await db.drawing_ideas.insert_many(default_ideas)
-        logger.info(f"Seeded {len(default_ideas)} default drawing ideas")
+        seeded = await sync_default_ideas(
+            repository, DEFAULT_DRAWING_IDEAS, WORKER_ID,
+            lease_seconds=SEED_LEASE_SECONDS, tags=DEFAULT_IDEA_TAGS
+        )
+        if seeded:
+            await bump_ideas_version()
+            logger.info(f"Seeded {seeded} default drawing ideas")
     except Exception as e:
         logger.error(f"Error seeding default ideas: {e}")
 
+def idea_page(ideas: List[dict], page_size: int, headers: Optional[dict] = None) -> Response:
+    """{items, next_cursor} from up to page_size + 1 rows"""
+    next_cursor = None
+    if len(ideas) > page_size:
+        ideas = ideas[:page_size]
+        last = ideas[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    return ORJSONResponse({"items": ideas, "next_cursor": next_cursor}, headers=headers)
+
 # Drawing Ideas Routes
-@api_router.get("/ideas", response_model=List[DrawingIdeaResponse])
-async def get_all_ideas():
-    """Get all drawing ideas"""
+@api_router.get("/ideas", response_model=Union[List[DrawingIdeaResponse], DrawingIdeaPage])
+async def get_all_ideas(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+):
+    """Get drawing ideas, newest first, optionally only those tagged `tag`
+
+    Without `limit` or `cursor` this returns the legacy plain array, served from
+    a per-version cache with an ETag (untagged lists only). Passing either
+    switches to keyset pagination and returns `{items, next_cursor}`.
+
+    Rows are projected to the response fields and encoded straight to JSON with
+    orjson; `response_model` only documents the shape. While the database is
+    unavailable the list comes from the in-memory pool, with X-Snapshot-Age.
+    """
+    paginated = limit is not None or cursor is not None
+    page_size = limit or DEFAULT_PAGE_SIZE
     try:
-        ideas = await db.drawing_ideas.find().sort("created_at", -1).to_list(1000)
-        return [DrawingIdeaResponse(**idea) for idea in ideas]
+        tag = normalize_tag(tag or "") or None
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        if not paginated:
+            version = await database(ideas_version.current(repository))
+            etag = etag_for(version)
+            headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+
+            if tag:
+                ideas = await database(repository.list_ideas(limit=LIST_ALL_LIMIT, tag=tag))
+                return Response(content=orjson.dumps(ideas), media_type="application/json", headers=headers)
+
+            cached = list_body_cache.get(version)
+            if cached is None:
+                ideas = await database(repository.list_ideas(limit=LIST_ALL_LIMIT))
+                cached = list_body_cache.put(version, orjson.dumps(ideas))
+
+            body, gzip_body = cached
+            if gzip_body is not None and "gzip" in request.headers.get("accept-encoding", ""):
+                body = gzip_body
+                headers["Content-Encoding"] = "gzip"
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        # Fetch one extra row to find out whether another page exists
+        ideas = await database(repository.list_ideas(limit=page_size + 1, after=after, tag=tag))
+        return idea_page(ideas, page_size)
+    except UnavailableError as e:
+        ideas = random_pool.list_ideas(page_size + 1 if paginated else LIST_ALL_LIMIT, after, tag)
+        if ideas is None:
+            raise unavailable(e.retry_after)
+        if not paginated:
+            return ORJSONResponse(ideas, headers=snapshot_headers())
+        return idea_page(ideas, page_size, snapshot_headers())
     except Exception as e:
         logger.error(f"Error fetching ideas: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch ideas")
 
-@api_router.get("/ideas/random", response_model=DrawingIdeaResponse)
-async def get_random_idea():
-    """Get a random drawing idea"""
+@api_router.get("/ideas/random", response_model=Union[DrawingIdeaResponse, List[DrawingIdeaResponse]])
+async def get_random_idea(
+    response: Response,
+    session: Optional[str] = None,
+    count: Optional[int] = Query(None, ge=1, le=RANDOM_MAX_COUNT),
+    exclude: Optional[str] = None,
+    tag: Optional[str] = None
+):
+    """Get a random drawing idea, optionally one tagged `tag`
+
+    Passing `session` (any value to start, then the returned X-Shuffle-Session
+    token) draws without replacement: no repeats until the session has seen
+    every idea, with newly added ideas joining the bag.
+
+    Passing `count` returns a list of up to `count` distinct ideas instead, so
+    clients can prefetch; `exclude` is a comma-separated list of ids to skip.
+    With a session, a list ends early rather than run into the next cycle.
+    """
     try:
-        # Get total count
-        total = await db.drawing_ideas.count_documents({})
-        if total == 0:
-            raise HTTPException(status_code=404, detail="No ideas available")
-        
-        # Get random idea using aggregation
-        pipeline = [{"$sample": {"size": 1}}]
-        cursor = db.drawing_ideas.aggregate(pipeline)
-        random_idea = await cursor.to_list(length=1)
-        
-        if not random_idea:
+        excluded = {idea_id for idea_id in (exclude or "").split(",") if idea_id}
+        if len(excluded) > RANDOM_MAX_EXCLUDE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"exclude accepts at most {RANDOM_MAX_EXCLUDE} ids"
+            )
+        wanted = count or 1
+        tag = normalize_tag(tag or "") or None
+
+        # Serve from the in-memory pool (or its per-tag pool); tops it up in the
+        # background when stale
+        refresh_pool()
+        if database_breaker.is_open and random_pool.is_warm:
+            response.headers.update(snapshot_headers())
+        pool_size = random_pool.size(tag)
+        if session is not None and random_pool.is_warm and pool_size:
+            token, bag = shuffle_bags.get_or_create(session, pool_size, tag)
+            response.headers["X-Shuffle-Session"] = token
+            # Excluded ideas are drawn and skipped; a response ends with the bag's
+            # cycle rather than starting the next one (which would repeat ideas)
+            ideas, seen = [], set()
+            eligible = min(wanted, random_pool.size(tag, excluded))
+            while len(ideas) < eligible:
+                if ideas and not bag.remaining(pool_size):
+                    break
+                idea = random_pool.get(bag.draw(pool_size), tag)
+                if idea["id"] in excluded or idea["id"] in seen:
+                    continue
+                seen.add(idea["id"])
+                ideas.append(DrawingIdeaResponse(**idea))
+            popularity.record_served(idea.id for idea in ideas)
+            if count is not None:
+                return ideas
+            if ideas:
+                return ideas[0]
+
+        ideas = random_pool.sample(wanted, excluded, tag)
+        if ideas is None:
+            # Pool is cold: let the storage backend pick them
+            try:
+                ideas = await database(repository.random_ideas(wanted, excluded, tag))
+            except UnavailableError as e:
+                raise unavailable(e.retry_after)
+        popularity.record_served(idea["id"] for idea in ideas)
+
+        if count is not None:
+            return [DrawingIdeaResponse(**idea) for idea in ideas]
+
+        if not ideas:
             raise HTTPException(status_code=404, detail="No ideas available")
-        
-        return DrawingIdeaResponse(**random_idea[0])
+
+        return DrawingIdeaResponse(**ideas[0])
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error fetching random idea: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch random idea")
 
+@api_router.get("/ideas/daily", response_model=DailyChallengeResponse)
+async def get_daily_idea(tz: str = "UTC"):
+    """Get the Challenge of the Day for the current date in `tz` (IANA name)
+
+    Served from the stored schedule and cacheable until the next local
+    midnight.
+    """
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail="Unknown timezone")
+    try:
+        if not database_breaker.is_open:
+            daily_schedule.schedule_rebuild(repository, random_pool, WORKER_ID)
+        now = datetime.now(zone)
+        idea = daily_schedule.get(now.date())
+        if idea is None:
+            # Cold or past the horizon: build synchronously once
+            await database(daily_schedule.rebuild(repository, random_pool, WORKER_ID))
+            idea = daily_schedule.get(now.date())
+        if idea is None:
+            raise HTTPException(status_code=404, detail="No ideas available")
+
+        expires = next_midnight(now)
+        max_age = max(0, int((expires - now).total_seconds()))
+        return ORJSONResponse(
+            {"date": now.date().isoformat(), "timezone": tz, "idea": idea},
+            headers={
+                "Cache-Control": f"public, max-age={max_age}",
+                "Expires": format_datetime(expires.astimezone(timezone.utc), usegmt=True),
+            }
+        )
+    except HTTPException:
+        raise
+    except UnavailableError as e:
+        raise unavailable(e.retry_after)
+    except Exception as e:
+        logger.error(f"Error fetching daily idea: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch daily idea")
+
+@api_router.get("/ideas/top", response_model=List[PopularIdeaResponse])
+async def get_top_ideas(
+    by: Literal["served", "drawn"] = "served",
+    limit: int = Query(10, ge=1, le=TOP_IDEAS_MAX_LIMIT)
+):
+    """Get the most served (or most drawn) ideas
+
+    Counters are written behind, so the latest POPULARITY_FLUSH_SECONDS of
+    activity may not be reflected yet.
+    """
+    try:
+        ideas = await database(repository.top_ideas(f"{by}_count", limit))
+        return [PopularIdeaResponse(**idea) for idea in ideas]
+    except UnavailableError as e:
+        raise unavailable(e.retry_after)
+    except Exception as e:
+        logger.error(f"Error fetching top ideas: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch top ideas")
+
+@api_router.get("/ideas/search", response_model=List[DrawingIdeaResponse])
+async def search_ideas(
+    response: Response,
+    q: Optional[str] = None,
+    prefix: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=SEARCH_MAX_LIMIT)
+):
+    """Search ideas by words (`q`) or autocomplete them as they are typed (`prefix`)
+
+    `q` uses the storage backend's text index, best match first. `prefix`
+    matches ideas having a word starting with each typed word and is served
+    from the in-memory pool's token index; ideas written by other workers
+    show up once the pool refreshes. While the database is unavailable, `q`
+    is answered like `prefix`.
+    """
+    if (q is None) == (prefix is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of q or prefix")
+    try:
+        query = q if q is not None else prefix
+        ideas = None
+        if prefix is not None:
+            refresh_pool()
+            ideas = random_pool.complete(prefix, limit)
+            if ideas is not None and database_breaker.is_open:
+                response.headers.update(snapshot_headers())
+        if ideas is None:
+            # Word search, or the pool is cold: ask the storage backend
+            try:
+                ideas = await database(repository.search_ideas(query, limit))
+            except UnavailableError as e:
+                ideas = random_pool.complete(query, limit)
+                if ideas is None:
+                    raise unavailable(e.retry_after)
+                response.headers.update(snapshot_headers())
+        return [DrawingIdeaResponse(**idea) for idea in ideas]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching ideas: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search ideas")
+
+@api_router.post("/ideas/{idea_id}/drawn", status_code=204)
+async def mark_idea_drawn(idea_id: str):
+    """Record that a user drew this idea
+
+    Ids are checked against the in-memory pool; they are only taken on
+    trust while it is still loading. An idea this worker has not seen yet
+    gets a 404 until the pool's next refresh picks it up.
+    """
+    if random_pool.is_warm and random_pool.lookup(idea_id) is None:
+        refresh_pool()
+        raise HTTPException(status_code=404, detail="Idea not found")
+    popularity.record_drawn(idea_id)
+    return Response(status_code=204)
+
+@api_router.get("/ideas/stream")
+async def stream_ideas():
+    """Stream newly created ideas as Server-Sent Events
+
+    `idea` events carry a new idea and a count delta of 1, `count` events a
+    delta for ideas added in bulk, and `resync` asks the client to reload
+    because it fell behind (or the change stream reconnected).
+    """
+    try:
+        subscription = idea_stream.subscribe()
+    except TooManySubscribersError:
+        raise HTTPException(status_code=503, detail="Too many open idea streams")
+    return StreamingResponse(
+        idea_stream.events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.post("/ideas", response_model=DrawingIdeaResponse)
-async def create_idea(idea_input: DrawingIdeaCreate):
-    """Create a new drawing idea"""
-    try:
-        # Check if idea already exists (case-insensitive)
-        existing = await db.drawing_ideas.find_one({
-            "text": {"$regex": f"^{idea_input.text.strip()}$", "$options": "i"}
-        })
-        if existing:
-            raise HTTPException(status_code=409, detail="This idea already exists")
-        
+async def create_idea(idea_input: DrawingIdeaCreate, response: Response):
+    """Create a new drawing idea
+
+    Submissions nearly identical to an existing idea are rejected or flagged,
+    depending on NEAR_DUPLICATE_MODE. With IDEA_WRITE_BUFFER the insert is
+    grouped with concurrent submissions.
+    """
+    try:
         # Create new idea
         new_idea = DrawingIdea(
             text=idea_input.text.strip(),
+            tags=idea_input.tags,
             user_submitted=True,
             created_at=datetime.utcnow()
         )
+
+        # Checked against the in-memory corpus; skipped while it is still loading
+        matches = random_pool.near_duplicates(new_idea.text, NEAR_DUPLICATE_THRESHOLD)
+        if matches:
+            similar, similarity = matches[0]
+            if NEAR_DUPLICATE_MODE == 'reject':
+                raise HTTPException(status_code=409, detail="A very similar idea already exists")
+            logger.info(f"Idea {new_idea.text!r} is {similarity:.2f} similar to {similar['text']!r}")
+            response.headers["X-Near-Duplicate-Of"] = similar["id"]
         
-        # Insert to database
-        result = await db.drawing_ideas.insert_one(new_idea.dict())
-        if not result.inserted_id:
-            raise HTTPException(status_code=500, detail="Failed to create idea")
-        
+        # Insert to database; the unique text_key rejects duplicates
+        try:
+            if write_buffer.is_running:
+                # The group writer updates the pool, version and stream
+                if not await write_buffer.submit(new_idea):
+                    raise DuplicateIdeaError(new_idea.text_key)
+            else:
+                await database(repository.create(new_idea))
+                random_pool.add(new_idea.dict())
+                await bump_ideas_version()
+                announce_new_ideas([new_idea])
+        except DuplicateIdeaError:
+            raise HTTPException(status_code=409, detail="This idea already exists")
+        except UnavailableError as e:
+            # Fail fast rather than queue writes behind a database that is down
+            raise unavailable(e.retry_after)
+
         return DrawingIdeaResponse(**new_idea.dict())
     except HTTPException:
         raise
@@ -115,29 +541,273 @@ async def create_idea(idea_input: DrawingIdeaCreate):
         logger.error(f"Error creating idea: {e}")
         raise HTTPException(status_code=500, detail="Failed to create idea")
 
+async def write_idea_group(ideas: List[DrawingIdea]) -> List[bool]:
+    """Group writer behind write_buffer: one insert_many, one version bump"""
+    inserted = await database(repository.insert_many(ideas))
+    created = [idea for idea, ok in zip(ideas, inserted) if ok]
+    for idea in created:
+        random_pool.add(idea.dict())
+    if created:
+        await bump_ideas_version()
+        announce_new_ideas(created)
+    return inserted
+
+@api_router.post("/ideas/batch", response_model=DrawingIdeaBatchResponse)
+async def create_ideas_batch(items: List[Any] = Body(...)):
+    """Create many drawing ideas at once, reporting a status per item"""
+    if len(items) > IDEA_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large (max {IDEA_BATCH_MAX_SIZE} ideas)"
+        )
+    try:
+        results: List[Optional[DrawingIdeaBatchItemResult]] = [None] * len(items)
+        candidates = {}  # text_key -> (index, DrawingIdea), first occurrence wins
+        now = datetime.utcnow()
+
+        # Validate and dedupe within the batch
+        for index, item in enumerate(items):
+            try:
+                idea_input = DrawingIdeaCreate.model_validate(item)
+                new_idea = DrawingIdea(
+                    text=idea_input.text.strip(),
+                    tags=idea_input.tags,
+                    user_submitted=True,
+                    created_at=now
+                )
+            except ValidationError as e:
+                results[index] = DrawingIdeaBatchItemResult(
+                    index=index, status="invalid", detail=e.errors()[0]["msg"]
+                )
+                continue
+
+            if new_idea.text_key in candidates:
+                results[index] = DrawingIdeaBatchItemResult(
+                    index=index, status="duplicate", detail="Duplicate within batch"
+                )
+                continue
+            candidates[new_idea.text_key] = (index, new_idea)
+
+        # Dedupe against the database in one indexed query
+        for text_key in await database(repository.existing_keys(candidates)):
+            index, _ = candidates.pop(text_key)
+            results[index] = DrawingIdeaBatchItemResult(
+                index=index, status="duplicate", detail="This idea already exists"
+            )
+
+        # Single unordered write; concurrent inserts still surface as duplicates
+        pending = list(candidates.values())
+        inserted = await database(repository.insert_many([idea for _, idea in pending]))
+        created = []
+        for (index, idea), ok in zip(pending, inserted):
+            if ok:
+                random_pool.add(idea.dict())
+                created.append(idea)
+                results[index] = DrawingIdeaBatchItemResult(index=index, status="created", id=idea.id)
+            else:
+                results[index] = DrawingIdeaBatchItemResult(
+                    index=index, status="duplicate", detail="This idea already exists"
+                )
+        if created:
+            await bump_ideas_version()
+            announce_new_ideas(created, bulk=True)
+
+        return DrawingIdeaBatchResponse(
+            created=sum(1 for r in results if r.status == "created"),
+            duplicates=sum(1 for r in results if r.status == "duplicate"),
+            invalid=sum(1 for r in results if r.status == "invalid"),
+            results=results
+        )
+    except UnavailableError as e:
+        raise unavailable(e.retry_after)
+    except Exception as e:
+        logger.error(f"Error creating idea batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create ideas")
+
+@api_router.get("/ideas/export")
+async def export_ideas(gzip: bool = False):
+    """Stream every drawing idea as NDJSON, optionally gzip-compressed"""
+    if database_breaker.is_open:
+        raise unavailable(database_breaker.retry_after())
+    ideas = repository.iter_ideas(batch_size=EXPORT_BATCH_SIZE)
+    filename = "drawing_ideas.ndjson.gz" if gzip else "drawing_ideas.ndjson"
+    return StreamingResponse(
+        export_chunks(ideas, compress=gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@api_router.post("/ideas/import", response_model=DrawingIdeaImportResponse)
+async def import_ideas(request: Request):
+    """Import ideas from an NDJSON body (plain or gzip), written in chunked bulk inserts
+
+    Each line is an idea object as produced by /ideas/export; `id`, `created_at`
+    and `user_submitted` are preserved when present (timestamps converted to
+    UTC). Ideas whose normalized text or id already exists are counted as
+    duplicates.
+    """
+    if database_breaker.is_open:
+        raise unavailable(database_breaker.retry_after())
+    imported = duplicates = invalid = 0
+    errors: List[str] = []
+    chunk: List[DrawingIdea] = []
+
+    def record_error(line_number: int, message: str):
+        nonlocal invalid
+        invalid += 1
+        if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+            errors.append(f"line {line_number}: {message}")
+
+    async def flush():
+        nonlocal imported, duplicates
+        inserted = await database(repository.insert_many(chunk))
+        created = []
+        for idea, ok in zip(chunk, inserted):
+            if ok:
+                imported += 1
+                random_pool.add(idea.dict())
+                created.append(idea)
+            else:
+                duplicates += 1
+        if created:
+            await bump_ideas_version()
+            announce_new_ideas(created, bulk=True)
+        chunk.clear()
+
+    try:
+        async for line_number, value in iter_lines(request.stream()):
+            if isinstance(value, NDJSONLineError):
+                record_error(line_number, str(value))
+                continue
+            try:
+                fields = {k: value[k] for k in IDEA_RESPONSE_FIELDS if k in value}
+                if isinstance(fields.get("text"), str):
+                    fields["text"] = fields["text"].strip()
+                chunk.append(DrawingIdea.model_validate(fields))
+            except ValidationError as e:
+                record_error(line_number, e.errors()[0]["msg"])
+                continue
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await flush()
+        await flush()
+    except UnavailableError as e:
+        raise unavailable(e.retry_after, detail=f"Import failed after {imported} ideas")
+    except Exception as e:
+        logger.error(f"Error importing ideas: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Import failed after {imported} ideas"
+        )
+
+    return DrawingIdeaImportResponse(
+        imported=imported,
+        duplicates=duplicates,
+        invalid=invalid,
+        errors=errors
+    )
+
+def tag_count_list(counts: dict) -> List[TagCount]:
+    return [
+        TagCount(tag=tag, count=count)
+        for tag, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        if count
+    ]
+
+@api_router.get("/tags", response_model=List[TagCount])
+async def get_tags(response: Response):
+    """Get every tag with its number of ideas, most used first
+
+    Counts are cached for TAG_COUNTS_TTL_SECONDS; while the database is
+    unavailable they are counted from the in-memory pool.
+    """
+    try:
+        now = time.monotonic()
+        if _tag_counts_cache["value"] is None or now >= _tag_counts_cache["expires_at"]:
+            try:
+                counts = await database(repository.tag_counts())
+            except UnavailableError as e:
+                counts = random_pool.tag_counts()
+                if counts is None:
+                    raise unavailable(e.retry_after)
+                response.headers.update(snapshot_headers())
+                return tag_count_list(counts)
+            _tag_counts_cache["value"] = tag_count_list(counts)
+            _tag_counts_cache["expires_at"] = now + TAG_COUNTS_TTL_SECONDS
+        return _tag_counts_cache["value"]
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching tags: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch tags")
+
 # Health check route
 @api_router.get("/")
 async def root():
     return {"message": "EmalfDraw API is running!"}
 
+async def cached_ideas_count() -> int:
+    """Estimated idea count (collection metadata on Mongo), reused for HEALTH_COUNT_TTL_SECONDS"""
+    now = time.monotonic()
+    if _ideas_count_cache["value"] is None or now >= _ideas_count_cache["expires_at"]:
+        _ideas_count_cache["value"] = await database(repository.count())
+        _ideas_count_cache["expires_at"] = now + HEALTH_COUNT_TTL_SECONDS
+    return _ideas_count_cache["value"]
+
+@api_router.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving; never touches the database"""
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: database reachable, with a cached idea count
+
+    Fails fast while the database circuit is open.
+    """
+    try:
+        await database(repository.ping())
+        return {
+            "status": "healthy",
+            "database": "connected",
+            "ideas_count": await cached_ideas_count()
+        }
+    except Exception as e:
+        return ORJSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "circuit": database_breaker.state, "error": str(e)}
+        )
+
 @api_router.get("/health")
-async def health_check():
-    """Health check endpoint"""
+async def health_check(deep: bool = False):
+    """Health check endpoint
+
+    Behaves like /health/ready; `?deep=1` runs an exact count of the collection.
+    """
+    if not deep:
+        return await readiness_check()
     try:
         # Test database connection
-        await db.command("ping")
-        idea_count = await db.drawing_ideas.count_documents({})
+        await database(repository.ping())
+        idea_count = await database(repository.count(exact=True))
         return {
             "status": "healthy",
             "database": "connected",
             "ideas_count": idea_count
         }
     except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
+        return {"status": "unhealthy", "circuit": database_breaker.state, "error": str(e)}
 
 # Include the router in the main app
 app.include_router(api_router)
 
+if METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        """Prometheus scrape endpoint"""
+        return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+    app.add_middleware(metrics.PrometheusMiddleware, skip_paths=["/metrics"])
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -146,6 +816,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if PROFILE_SECRET or PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=os.environ.get('PROFILE_DIR', str(ROOT_DIR / 'profiles')),
+        secret=PROFILE_SECRET,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        keep=int(os.environ.get('PROFILE_KEEP', '50')),
+        paths=os.environ.get('PROFILE_PATHS', '/api/ideas').split(','),
+        excluded_paths=os.environ.get('PROFILE_EXCLUDED_PATHS', '/api/ideas/stream').split(','),
+    )
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -155,9 +836,30 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
-    """Seed default ideas on startup"""
+    """Prepare storage (migrations, indexes) and seed default ideas on startup"""
+    await repository.setup()
+    logger.info(f"Using {repository.name} storage backend")
     await seed_default_ideas()
+    try:
+        await random_pool.refresh(repository)
+    except Exception as e:
+        logger.error(f"Error loading random idea pool: {e}")
+    try:
+        await daily_schedule.rebuild(repository, random_pool, WORKER_ID)
+    except Exception as e:
+        logger.error(f"Error building daily challenge schedule: {e}")
+    popularity.start(repository)
+    if IDEA_WRITE_BUFFER:
+        write_buffer.start(write_idea_group)
+    if IDEA_STREAM_CHANGE_STREAMS:
+        if repository.name == "mongo":
+            idea_stream.start_change_stream(repository)
+        else:
+            logger.warning(f"IDEA_STREAM_CHANGE_STREAMS needs MongoDB; {repository.name} streams local writes only")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await write_buffer.close()
+    await idea_stream.close()
+    await popularity.close(repository)
+    await repository.close()
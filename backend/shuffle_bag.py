@@ -0,0 +1,128 @@
+import random
+import secrets
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+MASK64 = (1 << 64) - 1
+FEISTEL_ROUNDS = 4
+
+
+def _mix(value: int) -> int:
+    """splitmix64 finalizer: a cheap, well-distributed 64-bit hash"""
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+def permute(index: int, size: int, seed: int) -> int:
+    """Map `index` in [0, size) to its position in a seeded pseudo-random permutation
+
+    A balanced Feistel network is a bijection on [0, 2**bits); indexes that
+    land outside [0, size) are walked again until they fall inside, which
+    keeps the mapping a bijection on [0, size) without storing it.
+    """
+    if size <= 1:
+        return 0
+    half = max(1, ((size - 1).bit_length() + 1) // 2)
+    mask = (1 << half) - 1
+    value = index
+    while True:
+        left, right = value >> half, value & mask
+        for round_number in range(FEISTEL_ROUNDS):
+            left, right = right, left ^ (_mix(seed ^ (round_number << 56) ^ right) & mask)
+        value = (left << half) | right
+        if value < size:
+            return value
+
+
+class ShuffleBag:
+    """Constant-size draw-without-replacement state for one session
+
+    The bag covers pool indexes [0, size) through a seeded permutation, plus
+    any ideas appended to the pool since the bag started ([size, current
+    size)), which are mixed in proportionally and served in arrival order.
+    Once everything has been drawn a new cycle starts with a fresh seed. A bag
+    drawing from one tag's pool starts over when the session switches tags.
+    """
+
+    __slots__ = ("seed", "size", "position", "extra", "expires_at", "tag")
+
+    def __init__(self, size: int, expires_at: float, tag: Optional[str] = None):
+        self.expires_at = expires_at
+        self.restart(size, tag)
+
+    def restart(self, size: int, tag: Optional[str] = None):
+        self.seed = random.getrandbits(64)
+        self.size = size
+        self.position = 0
+        self.extra = 0
+        self.tag = tag
+
+    def remaining(self, pool_size: int) -> int:
+        """Indexes left to draw in this cycle; the next draw starts a new cycle when 0"""
+        return max(0, pool_size - self.position - self.extra)
+
+    def draw(self, pool_size: int) -> int:
+        """Next pool index to serve"""
+        remaining = self.size - self.position
+        remaining_new = pool_size - self.size - self.extra
+        if remaining + remaining_new <= 0:
+            self.restart(pool_size, self.tag)
+            remaining, remaining_new = pool_size, 0
+
+        if remaining_new > 0 and random.random() * (remaining + remaining_new) < remaining_new:
+            index = self.size + self.extra
+            self.extra += 1
+            return index
+
+        index = permute(self.position, self.size, self.seed)
+        self.position += 1
+        return index
+
+
+class ShuffleBagStore:
+    """Session token -> ShuffleBag, expiring after `ttl_seconds` without use
+
+    Kept in least-recently-used order so expired sessions are always at the
+    front; at most `max_sessions` are held. Bags index this process's idea
+    pool, whose positions follow its own arrival order, so they cannot be
+    shared between workers: a token is only honoured by the worker that
+    issued it, and any other starts a new session.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600.0, max_sessions: int = 100000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._bags: "OrderedDict[str, ShuffleBag]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._bags)
+
+    def _expire(self, now: float):
+        while self._bags:
+            token, bag = next(iter(self._bags.items()))
+            if bag.expires_at > now:
+                break
+            del self._bags[token]
+
+    def get_or_create(
+        self, token: Optional[str], pool_size: int, tag: Optional[str] = None
+    ) -> Tuple[str, ShuffleBag]:
+        """Return the session's bag for `tag`, starting a new session if the token is unknown or expired"""
+        now = time.monotonic()
+        self._expire(now)
+        bag = self._bags.get(token) if token else None
+        if bag is None:
+            if len(self._bags) >= self.max_sessions:
+                self._bags.popitem(last=False)
+            token = secrets.token_urlsafe(16)
+            bag = ShuffleBag(pool_size, now + self.ttl_seconds, tag)
+            self._bags[token] = bag
+        else:
+            if bag.tag != tag:
+                bag.restart(pool_size, tag)
+            bag.expires_at = now + self.ttl_seconds
+            self._bags.move_to_end(token)
+        return token, bag
@@ -0,0 +1,63 @@
+"""Pluggable storage for drawing ideas
+
+The backend is chosen with STORAGE_BACKEND in .env:
+
+- `mongo` (default): MongoDB through Motor, using MONGO_URL and DB_NAME; pool size and
+  timeouts come from the MONGO_* settings read by mongo_client_options()
+- `memory`: process-local, for tests and benchmarks
+- `sqlite`: a local database file at SQLITE_PATH, via aiosqlite
+"""
+import os
+from pathlib import Path
+
+from storage.base import DuplicateIdeaError, IdeaRepository
+
+ROOT_DIR = Path(__file__).parent.parent
+
+BACKENDS = ("mongo", "memory", "sqlite")
+
+
+def mongo_client_options() -> dict:
+    """Motor client settings from the environment (read at call time, after .env is loaded)"""
+    return {
+        "maxPoolSize": int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+        "minPoolSize": int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        # Per operation: sent as maxTimeMS and enforced client side, pool waits included
+        "timeoutMS": int(os.environ.get('MONGO_TIMEOUT_MS', '5000')),
+        "connectTimeoutMS": int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000')),
+        "serverSelectionTimeoutMS": int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+    }
+
+
+def create_repository(backend: str = None, mongo_event_listeners: list = None) -> IdeaRepository:
+    """Build the repository selected by `backend` or STORAGE_BACKEND
+
+    `mongo_event_listeners` are pymongo monitoring listeners attached to the
+    Motor client; other backends ignore them.
+    """
+    backend = (backend or os.environ.get('STORAGE_BACKEND', 'mongo')).lower()
+
+    if backend == "mongo":
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from storage.mongo import MongoIdeaRepository
+        client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'], event_listeners=mongo_event_listeners or [], **mongo_client_options()
+        )
+        return MongoIdeaRepository(
+            client, os.environ['DB_NAME'],
+            # Migrations and index builds at startup; MONGO_TIMEOUT_MS is for requests
+            setup_timeout_seconds=float(os.environ.get('MONGO_SETUP_TIMEOUT_SECONDS', '3600'))
+        )
+
+    if backend == "memory":
+        from storage.memory import MemoryIdeaRepository
+        return MemoryIdeaRepository()
+
+    if backend == "sqlite":
+        from storage.sqlite import SQLiteIdeaRepository
+        return SQLiteIdeaRepository(os.environ.get('SQLITE_PATH', str(ROOT_DIR / 'emalfdraw.db')))
+
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (expected one of {', '.join(BACKENDS)})")
+
+
+__all__ = ["BACKENDS", "DuplicateIdeaError", "IdeaRepository", "create_repository", "mongo_client_options"]
@@ -0,0 +1,129 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from models import DrawingIdea
+
+
+class DuplicateIdeaError(Exception):
+    """An idea with the same normalized text already exists"""
+
+
+class IdeaRepository(ABC):
+    """Storage for drawing ideas
+
+    Read methods return plain dicts holding only the response fields
+    (see models.IDEA_RESPONSE_FIELDS) so routes can encode them directly.
+    Lists are ordered newest first by (created_at, id).
+    """
+
+    name = "base"
+    # Exceptions meaning the store is unreachable or overloaded (rather than
+    # the request being wrong); only these count towards opening the circuit breaker
+    unavailable_errors: Tuple[Type[BaseException], ...] = ()
+
+    async def setup(self):
+        """Create schema/indexes and run migrations; called once at startup"""
+
+    async def close(self):
+        """Release connections; called at shutdown"""
+
+    def watch_inserts(self) -> AsyncIterator[Optional[dict]]:
+        """Follow ideas inserted by any process, as they happen; only some backends can
+
+        Yields None once watching has started, then each inserted idea.
+        """
+        raise NotImplementedError(f"{self.name} storage cannot watch for inserts")
+
+    @abstractmethod
+    async def ping(self):
+        """Raise if the backing store is unreachable"""
+
+    @abstractmethod
+    async def list_ideas(
+        self, limit: int, after: Optional[Tuple[datetime, str]] = None, tag: Optional[str] = None
+    ) -> List[dict]:
+        """Up to `limit` ideas, newest first, strictly after the (created_at, id) position,
+        optionally only those tagged `tag`"""
+
+    @abstractmethod
+    def iter_ideas(self, since: Optional[datetime] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        """Stream ideas oldest first, optionally only those created at or after `since`"""
+
+    @abstractmethod
+    async def random_ideas(
+        self, count: int = 1, exclude: Iterable[str] = (), tag: Optional[str] = None
+    ) -> List[dict]:
+        """Up to `count` distinct ideas picked at random, skipping ids in `exclude`,
+        optionally only among those tagged `tag`"""
+
+    @abstractmethod
+    async def search_ideas(self, query: str, limit: int) -> List[dict]:
+        """Up to `limit` ideas matching the words of `query`, best match first"""
+
+    @abstractmethod
+    async def create(self, idea: DrawingIdea):
+        """Insert one idea; raise DuplicateIdeaError when its text_key (or id) is taken"""
+
+    @abstractmethod
+    async def insert_many(self, ideas: List[DrawingIdea]) -> List[bool]:
+        """Insert ideas in one unordered write; False marks ideas rejected as duplicates
+        (same text_key, or an id already in use)"""
+
+    @abstractmethod
+    async def existing_keys(self, keys: Iterable[str]) -> Set[str]:
+        """The subset of `keys` already stored"""
+
+    @abstractmethod
+    async def tag_counts(self) -> Dict[str, int]:
+        """Number of ideas per tag"""
+
+    @abstractmethod
+    async def count(self, exact: bool = False) -> int:
+        """Number of ideas; backends may return a cheap estimate unless `exact`"""
+
+    @abstractmethod
+    async def upsert_ideas(self, ideas: List[DrawingIdea]) -> int:
+        """Insert ideas whose text_key is not stored yet; existing ones only gain the
+        ideas' tags. Returns how many were inserted"""
+
+    @abstractmethod
+    async def get_seed_state(self, name: str) -> Optional[dict]:
+        """The last applied seed state ({"fingerprint", "keys"}), or None"""
+
+    @abstractmethod
+    async def save_seed_state(self, name: str, fingerprint: str, keys: list):
+        """Record the seed state applied by a successful sync; `keys` holds [text_key, tags] pairs"""
+
+    @abstractmethod
+    async def get_schedule(self, name: str) -> Optional[dict]:
+        """A stored schedule document (JSON-compatible), or None"""
+
+    @abstractmethod
+    async def save_schedule(self, name: str, state: dict):
+        """Replace a stored schedule document"""
+
+    @abstractmethod
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        """Take (or renew) a named lease shared by every worker; False if someone else holds it"""
+
+    @abstractmethod
+    async def release_lease(self, name: str, owner: str):
+        """Give up a lease held by `owner`"""
+
+    @abstractmethod
+    async def increment_counters(self, deltas: Dict[str, List[int]]):
+        """Add per-idea deltas to the IDEA_COUNTER_FIELDS counters in one unordered write;
+        unknown ids are ignored"""
+
+    @abstractmethod
+    async def top_ideas(self, field: str, limit: int) -> List[dict]:
+        """Ideas with the highest `field` counter, with both counters included"""
+
+    @abstractmethod
+    async def get_version(self, name: str) -> int:
+        """Current value of a monotonic version counter (0 when never bumped)"""
+
+    @abstractmethod
+    async def bump_version(self, name: str) -> int:
+        """Increment a version counter and return the new value"""
@@ -0,0 +1,175 @@
+import bisect
+import copy
+import heapq
+import random
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from models import IDEA_COUNTER_FIELDS, IDEA_RESPONSE_FIELDS, DrawingIdea
+from search_index import tokenize
+from storage.base import DuplicateIdeaError, IdeaRepository
+
+
+class MemoryIdeaRepository(IdeaRepository):
+    """Process-local storage; fast and deterministic for tests and benchmarks
+
+    Ideas are kept in a list sorted by (created_at, id), plus one such list
+    per tag, so keyset pages are a bisect away. Nothing survives a restart.
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._order: List[Tuple[datetime, str]] = []
+        self._by_tag: Dict[str, List[Tuple[datetime, str]]] = defaultdict(list)
+        self._by_id: Dict[str, dict] = {}
+        # text_key -> idea id
+        self._keys: Dict[str, str] = {}
+        self._versions: Dict[str, int] = defaultdict(int)
+        # idea id -> counters in IDEA_COUNTER_FIELDS order
+        self._counters: Dict[str, List[int]] = {}
+        self._seed_states: Dict[str, dict] = {}
+        self._schedules: Dict[str, dict] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+
+    def _row(self, idea_id: str) -> dict:
+        row = dict(self._by_id[idea_id])
+        row["tags"] = list(row["tags"])
+        return row
+
+    def _insert(self, idea: DrawingIdea) -> bool:
+        # Imported ideas bring their own ids; a taken id counts as a duplicate
+        if idea.text_key in self._keys or idea.id in self._by_id:
+            return False
+        self._keys[idea.text_key] = idea.id
+        self._by_id[idea.id] = {field: getattr(idea, field) for field in IDEA_RESPONSE_FIELDS}
+        self._by_id[idea.id]["tags"] = []
+        bisect.insort(self._order, (idea.created_at, idea.id))
+        self._add_tags(idea.id, idea.tags)
+        return True
+
+    def _add_tags(self, idea_id: str, tags: List[str]):
+        row = self._by_id[idea_id]
+        for tag in tags:
+            if tag not in row["tags"]:
+                row["tags"].append(tag)
+                bisect.insort(self._by_tag[tag], (row["created_at"], idea_id))
+
+    def _ordered(self, tag: Optional[str]) -> List[Tuple[datetime, str]]:
+        return self._by_tag.get(tag, []) if tag else self._order
+
+    async def ping(self):
+        return None
+
+    async def list_ideas(
+        self, limit: int, after: Optional[Tuple[datetime, str]] = None, tag: Optional[str] = None
+    ) -> List[dict]:
+        order = self._ordered(tag)
+        end = bisect.bisect_left(order, after) if after else len(order)
+        start = max(0, end - limit)
+        return [self._row(idea_id) for _, idea_id in reversed(order[start:end])]
+
+    async def iter_ideas(self, since: Optional[datetime] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        start = bisect.bisect_left(self._order, (since, "")) if since else 0
+        for _, idea_id in self._order[start:]:
+            yield self._row(idea_id)
+
+    async def random_ideas(
+        self, count: int = 1, exclude: Iterable[str] = (), tag: Optional[str] = None
+    ) -> List[dict]:
+        exclude = set(exclude)
+        candidates = [idea_id for _, idea_id in self._ordered(tag) if idea_id not in exclude]
+        picked = random.sample(candidates, min(count, len(candidates)))
+        return [self._row(idea_id) for idea_id in picked]
+
+    async def search_ideas(self, query: str, limit: int) -> List[dict]:
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        # Scan newest first and rank by how many query words each idea contains
+        scored = []
+        for rank, (_, idea_id) in enumerate(reversed(self._order)):
+            matches = len(terms.intersection(tokenize(self._by_id[idea_id]["text"])))
+            if matches:
+                scored.append((-matches, rank, idea_id))
+        return [self._row(idea_id) for _, _, idea_id in heapq.nsmallest(limit, scored)]
+
+    async def create(self, idea: DrawingIdea):
+        if not self._insert(idea):
+            raise DuplicateIdeaError(idea.text_key)
+
+    async def insert_many(self, ideas: List[DrawingIdea]) -> List[bool]:
+        return [self._insert(idea) for idea in ideas]
+
+    async def existing_keys(self, keys: Iterable[str]) -> Set[str]:
+        return {key for key in keys if key in self._keys}
+
+    async def tag_counts(self) -> Dict[str, int]:
+        return {tag: len(ideas) for tag, ideas in self._by_tag.items() if ideas}
+
+    async def count(self, exact: bool = False) -> int:
+        return len(self._order)
+
+    async def upsert_ideas(self, ideas: List[DrawingIdea]) -> int:
+        inserted = 0
+        for idea in ideas:
+            if self._insert(idea):
+                inserted += 1
+            elif idea.text_key in self._keys:
+                self._add_tags(self._keys[idea.text_key], idea.tags)
+        return inserted
+
+    async def get_seed_state(self, name: str) -> Optional[dict]:
+        state = self._seed_states.get(name)
+        return dict(state) if state else None
+
+    async def save_seed_state(self, name: str, fingerprint: str, keys: list):
+        self._seed_states[name] = {"fingerprint": fingerprint, "keys": list(keys)}
+
+    async def get_schedule(self, name: str) -> Optional[dict]:
+        state = self._schedules.get(name)
+        return copy.deepcopy(state) if state else None
+
+    async def save_schedule(self, name: str, state: dict):
+        self._schedules[name] = copy.deepcopy(state)
+
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.monotonic()
+        holder = self._leases.get(name)
+        if holder and holder[0] != owner and holder[1] > now:
+            return False
+        self._leases[name] = (owner, now + ttl_seconds)
+        return True
+
+    async def release_lease(self, name: str, owner: str):
+        if self._leases.get(name, (None,))[0] == owner:
+            del self._leases[name]
+
+    async def increment_counters(self, deltas: Dict[str, List[int]]):
+        for idea_id, amounts in deltas.items():
+            if idea_id not in self._by_id:
+                continue
+            counters = self._counters.setdefault(idea_id, [0] * len(IDEA_COUNTER_FIELDS))
+            for position, amount in enumerate(amounts):
+                counters[position] += amount
+
+    async def top_ideas(self, field: str, limit: int) -> List[dict]:
+        position = IDEA_COUNTER_FIELDS.index(field)
+        ranked = heapq.nlargest(
+            limit,
+            (item for item in self._counters.items() if item[1][position] > 0),
+            key=lambda item: item[1][position]
+        )
+        return [
+            {**self._row(idea_id), **dict(zip(IDEA_COUNTER_FIELDS, counters))}
+            for idea_id, counters in ranked
+        ]
+
+    async def get_version(self, name: str) -> int:
+        return self._versions[name]
+
+    async def bump_version(self, name: str) -> int:
+        self._versions[name] += 1
+        return self._versions[name]
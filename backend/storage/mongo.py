@@ -0,0 +1,272 @@
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+import pymongo
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, DuplicateKeyError, ExecutionTimeout, NetworkTimeout
+
+from migrations import TEXT_KEY_INDEX, run_migrations
+from models import IDEA_COUNTER_FIELDS, IDEA_RESPONSE_FIELDS, IDEA_RESPONSE_PROJECTION, DrawingIdea
+from pagination import IDEA_SORT
+from storage.base import DuplicateIdeaError, IdeaRepository
+
+logger = logging.getLogger(__name__)
+
+# Mongo error code for unique index violations
+DUPLICATE_KEY_ERROR = 11000
+
+# How long each change stream poll waits on the server; must stay below the
+# client's timeoutMS, which bounds every poll
+CHANGE_STREAM_AWAIT_MS = 1000
+
+
+class MongoIdeaRepository(IdeaRepository):
+    """Motor-backed storage in the `drawing_ideas` collection
+
+    Version counters, seed state, schedules and leases live in the `meta` collection.
+    """
+
+    name = "mongo"
+    # Server selection and pool waits are ConnectionFailures too
+    unavailable_errors = (ConnectionFailure, ExecutionTimeout, NetworkTimeout)
+
+    def __init__(self, client, db_name: str, setup_timeout_seconds: float = 3600.0):
+        self.client = client
+        self.db = client[db_name]
+        self.collection = self.db.drawing_ideas
+        self.setup_timeout_seconds = setup_timeout_seconds
+
+    def _indexes(self) -> List[Tuple[list, dict]]:
+        """(keys, options) of every index on drawing_ideas"""
+        return [
+            # Serves both the newest-first list and keyset pagination
+            (IDEA_SORT, {"name": "created_at_id"}),
+            # Enforces duplicate detection on the normalized text
+            ([("text_key", 1)], {"unique": True, "name": TEXT_KEY_INDEX}),
+            # Multikey: serves tag-filtered lists in newest-first order
+            ([("tags", 1), *IDEA_SORT], {"name": "tags_created_at_id"}),
+            # Ids are unique (imports bring their own); counter flushes update by id
+            ([("id", 1)], {"unique": True, "name": "id_unique"}),
+            # The top lists read the counters in order
+            *(([(field, -1)], {"name": f"{field}_desc"}) for field in IDEA_COUNTER_FIELDS),
+            # Word search (stemmed, stop words ignored) for /ideas/search?q=
+            ([("text", "text")], {"name": "text_search"}),
+        ]
+
+    async def setup(self):
+        # Backfills and index builds over a large collection take far longer than
+        # the per-operation timeoutMS meant for requests
+        with pymongo.timeout(self.setup_timeout_seconds):
+            try:
+                await run_migrations(self.db)
+            except Exception as e:
+                logger.error(f"Error running migrations: {e}")
+            try:
+                # Replaced by id_unique; the non-unique "id" index of earlier releases
+                if "id" in await self.collection.index_information():
+                    await self.collection.drop_index("id")
+            except Exception as e:
+                logger.error(f"Error dropping the old id index: {e}")
+            # One at a time, so one failed build doesn't skip the others
+            for keys, options in self._indexes():
+                try:
+                    await self.collection.create_index(keys, **options)
+                except Exception as e:
+                    logger.error(f"Error creating index {options['name']}: {e}")
+
+    async def close(self):
+        self.client.close()
+
+    async def ping(self):
+        await self.db.command("ping")
+
+    async def watch_inserts(self) -> AsyncIterator[Optional[dict]]:
+        # Change streams need a replica set (or sharded cluster)
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        async with self.collection.watch(pipeline, max_await_time_ms=CHANGE_STREAM_AWAIT_MS) as stream:
+            yield None
+            # Short polls rather than one open-ended wait, which timeoutMS would cut off
+            while stream.alive:
+                change = await stream.try_next()
+                if change is None:
+                    continue
+                doc = change["fullDocument"]
+                yield {field: doc.get(field) for field in IDEA_RESPONSE_FIELDS}
+
+    async def list_ideas(
+        self, limit: int, after: Optional[Tuple[datetime, str]] = None, tag: Optional[str] = None
+    ) -> List[dict]:
+        query = {"tags": tag} if tag else {}
+        if after:
+            created_at, idea_id = after
+            query["$or"] = [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "id": {"$lt": idea_id}},
+            ]
+        cursor = self.collection.find(query, IDEA_RESPONSE_PROJECTION).sort(IDEA_SORT).limit(limit)
+        return await cursor.to_list(limit)
+
+    async def iter_ideas(self, since: Optional[datetime] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        query = {"created_at": {"$gte": since}} if since else {}
+        cursor = self.collection.find(query, IDEA_RESPONSE_PROJECTION) \
+            .sort("created_at", 1).batch_size(batch_size)
+        try:
+            async for doc in cursor:
+                yield doc
+        finally:
+            await cursor.close()
+
+    async def random_ideas(
+        self, count: int = 1, exclude: Iterable[str] = (), tag: Optional[str] = None
+    ) -> List[dict]:
+        exclude = list(exclude)
+        # Oversample by the exclude list instead of $match-ing first, which would
+        # turn $sample's random cursor into a collection scan. A tag match is
+        # served by the tags index.
+        pipeline = [{"$match": {"tags": tag}}] if tag else []
+        pipeline.append({"$sample": {"size": count + len(exclude)}})
+        if exclude:
+            pipeline += [{"$match": {"id": {"$nin": exclude}}}, {"$limit": count}]
+        pipeline.append({"$project": IDEA_RESPONSE_PROJECTION})
+        return await self.collection.aggregate(pipeline).to_list(length=count)
+
+    async def search_ideas(self, query: str, limit: int) -> List[dict]:
+        score = {"$meta": "textScore"}
+        cursor = self.collection.find(
+            {"$text": {"$search": query}}, {**IDEA_RESPONSE_PROJECTION, "score": score}
+        ).sort([("score", score)]).limit(limit)
+        return [
+            {field: doc[field] for field in IDEA_RESPONSE_FIELDS}
+            for doc in await cursor.to_list(limit)
+        ]
+
+    async def create(self, idea: DrawingIdea):
+        try:
+            await self.collection.insert_one(idea.dict())
+        except DuplicateKeyError:
+            raise DuplicateIdeaError(idea.text_key)
+
+    async def insert_many(self, ideas: List[DrawingIdea]) -> List[bool]:
+        if not ideas:
+            return []
+        inserted = [True] * len(ideas)
+        try:
+            await self.collection.insert_many([idea.dict() for idea in ideas], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    raise
+                inserted[error["index"]] = False
+        return inserted
+
+    async def existing_keys(self, keys: Iterable[str]) -> Set[str]:
+        keys = list(keys)
+        if not keys:
+            return set()
+        cursor = self.collection.find({"text_key": {"$in": keys}}, {"_id": 0, "text_key": 1})
+        return {doc["text_key"] async for doc in cursor}
+
+    async def tag_counts(self) -> Dict[str, int]:
+        pipeline = [
+            {"$match": {"tags.0": {"$exists": True}}},
+            {"$project": {"_id": 0, "tags": 1}},
+            {"$unwind": "$tags"},
+            {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+        ]
+        return {doc["_id"]: doc["count"] async for doc in self.collection.aggregate(pipeline)}
+
+    async def count(self, exact: bool = False) -> int:
+        if exact:
+            return await self.collection.count_documents({})
+        return await self.collection.estimated_document_count()
+
+    async def upsert_ideas(self, ideas: List[DrawingIdea]) -> int:
+        if not ideas:
+            return 0
+        operations = []
+        for idea in ideas:
+            doc = idea.dict()
+            key = doc.pop("text_key")
+            tags = doc.pop("tags")
+            update = {"$setOnInsert": doc}
+            if tags:
+                update["$addToSet"] = {"tags": {"$each": tags}}
+            else:
+                update["$setOnInsert"]["tags"] = []
+            operations.append(UpdateOne({"text_key": key}, update, upsert=True))
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            return result.upserted_count
+        except BulkWriteError as e:
+            # Two upserts racing on the same key: the loser hits the unique index
+            for error in e.details.get("writeErrors", []):
+                if error.get("code") != DUPLICATE_KEY_ERROR:
+                    raise
+            return e.details.get("nUpserted", 0)
+
+    async def get_seed_state(self, name: str) -> Optional[dict]:
+        doc = await self.db.meta.find_one({"_id": f"seed:{name}"}, {"_id": 0})
+        return doc or None
+
+    async def save_seed_state(self, name: str, fingerprint: str, keys: list):
+        await self.db.meta.update_one(
+            {"_id": f"seed:{name}"},
+            {"$set": {"fingerprint": fingerprint, "keys": list(keys)}},
+            upsert=True
+        )
+
+    async def get_schedule(self, name: str) -> Optional[dict]:
+        doc = await self.db.meta.find_one({"_id": f"schedule:{name}"}, {"_id": 0})
+        return doc or None
+
+    async def save_schedule(self, name: str, state: dict):
+        await self.db.meta.replace_one({"_id": f"schedule:{name}"}, state, upsert=True)
+
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        now = datetime.utcnow()
+        try:
+            # Matches only a free, expired or already-owned lease; otherwise the
+            # upsert collides with the holder's _id
+            await self.db.meta.update_one(
+                {"_id": f"lease:{name}", "$or": [{"expires_at": {"$lte": now}}, {"owner": owner}]},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def release_lease(self, name: str, owner: str):
+        await self.db.meta.delete_one({"_id": f"lease:{name}", "owner": owner})
+
+    async def increment_counters(self, deltas: Dict[str, List[int]]):
+        operations = [
+            UpdateOne({"id": idea_id}, {"$inc": {
+                field: amount for field, amount in zip(IDEA_COUNTER_FIELDS, amounts) if amount
+            }})
+            for idea_id, amounts in deltas.items() if any(amounts)
+        ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def top_ideas(self, field: str, limit: int) -> List[dict]:
+        projection = {**IDEA_RESPONSE_PROJECTION, **{name: 1 for name in IDEA_COUNTER_FIELDS}}
+        cursor = self.collection.find({field: {"$gt": 0}}, projection).sort(field, -1).limit(limit)
+        return [
+            {**doc, **{name: doc.get(name, 0) for name in IDEA_COUNTER_FIELDS}}
+            for doc in await cursor.to_list(limit)
+        ]
+
+    async def get_version(self, name: str) -> int:
+        doc = await self.db.meta.find_one({"_id": name})
+        return doc["version"] if doc else 0
+
+    async def bump_version(self, name: str) -> int:
+        doc = await self.db.meta.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return doc["version"]
@@ -0,0 +1,424 @@
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+import aiosqlite
+
+from models import IDEA_COUNTER_FIELDS, DrawingIdea
+from search_index import tokenize
+from storage.base import DuplicateIdeaError, IdeaRepository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drawing_ideas (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    text_key TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    user_submitted INTEGER NOT NULL DEFAULT 1,
+    served_count INTEGER NOT NULL DEFAULT 0,
+    drawn_count INTEGER NOT NULL DEFAULT 0,
+    tags TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS created_at_id ON drawing_ideas (created_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS idea_tags (
+    tag TEXT NOT NULL,
+    idea_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (tag, idea_id)
+);
+CREATE INDEX IF NOT EXISTS idea_tags_created_at_id ON idea_tags (tag, created_at DESC, idea_id DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seed_state (
+    name TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    keys TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedules (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Columns added after the first release, with their definitions
+ADDED_COLUMNS = {
+    **{field: "INTEGER NOT NULL DEFAULT 0" for field in IDEA_COUNTER_FIELDS},
+    "tags": "TEXT NOT NULL DEFAULT '[]'",
+}
+
+# Created after the counter columns are added to databases that predate them
+COUNTER_INDEXES = "".join(
+    f"CREATE INDEX IF NOT EXISTS {field}_desc ON drawing_ideas ({field} DESC);\n"
+    for field in IDEA_COUNTER_FIELDS
+)
+
+# Full-text index over drawing_ideas.text, kept in sync by triggers so writes
+# from every worker process are indexed
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE idea_search USING fts5(
+    text, content='drawing_ideas', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER idea_search_insert AFTER INSERT ON drawing_ideas BEGIN
+    INSERT INTO idea_search (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER idea_search_delete AFTER DELETE ON drawing_ideas BEGIN
+    INSERT INTO idea_search (idea_search, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+INSERT INTO idea_search (idea_search) VALUES ('rebuild');
+"""
+
+COLUMN_NAMES = ("id", "text", "created_at", "user_submitted", "tags")
+COLUMNS = ", ".join(COLUMN_NAMES)
+# The same columns read through a join with idea_tags
+JOINED_COLUMNS = ", ".join(f"d.{name}" for name in COLUMN_NAMES)
+
+# SQLite caps the number of bound parameters per statement
+MAX_PARAMS = 900
+
+
+def _timestamp(value: datetime) -> str:
+    # Fixed-width ISO strings sort the same way as the datetimes they encode
+    return value.isoformat(timespec="microseconds")
+
+
+def _row(row) -> dict:
+    return {
+        "id": row[0],
+        "text": row[1],
+        "created_at": datetime.fromisoformat(row[2]),
+        "user_submitted": bool(row[3]),
+        "tags": json.loads(row[4]),
+    }
+
+
+class SQLiteIdeaRepository(IdeaRepository):
+    """aiosqlite-backed storage for small, zero-dependency deployments"""
+
+    name = "sqlite"
+    # "database is locked", disk I/O errors and the like
+    unavailable_errors = (sqlite3.OperationalError,)
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[aiosqlite.Connection] = None
+        # One shared connection: keep concurrent writers from interleaving transactions
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def conn(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            raise RuntimeError("SQLite repository used before setup()")
+        return self._conn
+
+    async def setup(self):
+        if self._conn is None:
+            self._conn = await aiosqlite.connect(self.path)
+            await self._conn.execute("PRAGMA journal_mode=WAL")
+            await self._conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.executescript(SCHEMA)
+        async with self.conn.execute("PRAGMA table_info(drawing_ideas)") as cursor:
+            existing = {row[1] for row in await cursor.fetchall()}
+        for name, definition in ADDED_COLUMNS.items():
+            if name not in existing:
+                await self.conn.execute(f"ALTER TABLE drawing_ideas ADD COLUMN {name} {definition}")
+        await self.conn.executescript(COUNTER_INDEXES)
+        async with self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'idea_search'"
+        ) as cursor:
+            has_search = await cursor.fetchone() is not None
+        if not has_search:
+            # Also indexes the ideas stored before the search table existed
+            await self.conn.executescript(SEARCH_SCHEMA)
+        await self.conn.commit()
+
+    async def close(self):
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def ping(self):
+        await self.conn.execute("SELECT 1")
+
+    async def list_ideas(
+        self, limit: int, after: Optional[Tuple[datetime, str]] = None, tag: Optional[str] = None
+    ) -> List[dict]:
+        if tag:
+            return await self._list_tagged(limit, after, tag)
+        if after:
+            created_at, idea_id = after
+            sql = (
+                f"SELECT {COLUMNS} FROM drawing_ideas "
+                "WHERE created_at < ? OR (created_at = ? AND id < ?) "
+                "ORDER BY created_at DESC, id DESC LIMIT ?"
+            )
+            params = (_timestamp(created_at), _timestamp(created_at), idea_id, limit)
+        else:
+            sql = f"SELECT {COLUMNS} FROM drawing_ideas ORDER BY created_at DESC, id DESC LIMIT ?"
+            params = (limit,)
+        async with self.conn.execute(sql, params) as cursor:
+            return [_row(row) for row in await cursor.fetchall()]
+
+    async def _list_tagged(self, limit: int, after: Optional[Tuple[datetime, str]], tag: str) -> List[dict]:
+        # Walk the (tag, created_at, idea_id) index, then look each idea up by id
+        sql = f"SELECT {JOINED_COLUMNS} FROM idea_tags t JOIN drawing_ideas d ON d.id = t.idea_id WHERE t.tag = ? "
+        params = [tag]
+        if after:
+            created_at, idea_id = after
+            sql += "AND (t.created_at < ? OR (t.created_at = ? AND t.idea_id < ?)) "
+            params += [_timestamp(created_at), _timestamp(created_at), idea_id]
+        sql += "ORDER BY t.created_at DESC, t.idea_id DESC LIMIT ?"
+        params.append(limit)
+        async with self.conn.execute(sql, params) as cursor:
+            return [_row(row) for row in await cursor.fetchall()]
+
+    async def iter_ideas(self, since: Optional[datetime] = None, batch_size: int = 1000) -> AsyncIterator[dict]:
+        if since:
+            sql = f"SELECT {COLUMNS} FROM drawing_ideas WHERE created_at >= ? ORDER BY created_at, id"
+            params = (_timestamp(since),)
+        else:
+            sql = f"SELECT {COLUMNS} FROM drawing_ideas ORDER BY created_at, id"
+            params = ()
+        async with self.conn.execute(sql, params) as cursor:
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _row(row)
+
+    async def random_ideas(
+        self, count: int = 1, exclude: Iterable[str] = (), tag: Optional[str] = None
+    ) -> List[dict]:
+        exclude = list(exclude)[:MAX_PARAMS]
+        if tag:
+            placeholders = ",".join("?" * len(exclude))
+            async with self.conn.execute(
+                f"SELECT {JOINED_COLUMNS} FROM idea_tags t JOIN drawing_ideas d ON d.id = t.idea_id "
+                f"WHERE t.tag = ? AND t.idea_id NOT IN ({placeholders}) ORDER BY RANDOM() LIMIT ?",
+                (tag, *exclude, count)
+            ) as cursor:
+                return [_row(row) for row in await cursor.fetchall()]
+
+        if exclude:
+            placeholders = ",".join("?" * len(exclude))
+            async with self.conn.execute(
+                f"SELECT {COLUMNS} FROM drawing_ideas WHERE id NOT IN ({placeholders}) "
+                "ORDER BY RANDOM() LIMIT ?",
+                (*exclude, count)
+            ) as cursor:
+                return [_row(row) for row in await cursor.fetchall()]
+
+        async with self.conn.execute("SELECT MAX(rowid) FROM drawing_ideas") as cursor:
+            (max_rowid,) = await cursor.fetchone()
+        if not max_rowid:
+            return []
+        # Seek to random rowids through the primary key instead of ORDER BY RANDOM()
+        picked = {}
+        for _ in range(count * 3):
+            if len(picked) >= count:
+                break
+            async with self.conn.execute(
+                f"SELECT {COLUMNS} FROM drawing_ideas WHERE rowid >= ? ORDER BY rowid LIMIT 1",
+                (random.randint(1, max_rowid),)
+            ) as cursor:
+                row = await cursor.fetchone()
+            if row:
+                picked[row[0]] = _row(row)
+        return list(picked.values())
+
+    async def search_ideas(self, query: str, limit: int) -> List[dict]:
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        # Quoted terms, so user input is never parsed as FTS5 query syntax
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        async with self.conn.execute(
+            f"SELECT {JOINED_COLUMNS} FROM idea_search s JOIN drawing_ideas d ON d.rowid = s.rowid "
+            "WHERE idea_search MATCH ? ORDER BY s.rank LIMIT ?",
+            (match, limit)
+        ) as cursor:
+            return [_row(row) for row in await cursor.fetchall()]
+
+    async def _insert(self, idea: DrawingIdea) -> bool:
+        cursor = await self.conn.execute(
+            "INSERT INTO drawing_ideas (id, text, text_key, created_at, user_submitted, tags) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+            (idea.id, idea.text, idea.text_key, _timestamp(idea.created_at), int(idea.user_submitted),
+             json.dumps(idea.tags))
+        )
+        if cursor.rowcount != 1:
+            return False
+        await self._index_tags(idea.id, idea.created_at, idea.tags)
+        return True
+
+    async def _index_tags(self, idea_id: str, created_at: datetime, tags: List[str]):
+        if tags:
+            await self.conn.executemany(
+                "INSERT INTO idea_tags (tag, idea_id, created_at) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+                [(tag, idea_id, _timestamp(created_at)) for tag in tags]
+            )
+
+    async def _merge_tags(self, idea: DrawingIdea):
+        """Add `idea.tags` to the stored idea with the same text_key"""
+        async with self.conn.execute(
+            "SELECT id, created_at, tags FROM drawing_ideas WHERE text_key = ?", (idea.text_key,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return
+        idea_id, created_at, stored = row[0], datetime.fromisoformat(row[1]), json.loads(row[2])
+        added = [tag for tag in idea.tags if tag not in stored]
+        if added:
+            await self.conn.execute(
+                "UPDATE drawing_ideas SET tags = ? WHERE id = ?", (json.dumps(stored + added), idea_id)
+            )
+            await self._index_tags(idea_id, created_at, added)
+
+    async def create(self, idea: DrawingIdea):
+        async with self._write_lock:
+            inserted = await self._insert(idea)
+            await self.conn.commit()
+        if not inserted:
+            raise DuplicateIdeaError(idea.text_key)
+
+    async def insert_many(self, ideas: List[DrawingIdea]) -> List[bool]:
+        async with self._write_lock:
+            try:
+                inserted = [await self._insert(idea) for idea in ideas]
+            except sqlite3.Error:
+                await self.conn.rollback()
+                raise
+            await self.conn.commit()
+        return inserted
+
+    async def existing_keys(self, keys: Iterable[str]) -> Set[str]:
+        keys = list(keys)
+        found = set()
+        for start in range(0, len(keys), MAX_PARAMS):
+            chunk = keys[start:start + MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            async with self.conn.execute(
+                f"SELECT text_key FROM drawing_ideas WHERE text_key IN ({placeholders})", chunk
+            ) as cursor:
+                found.update(row[0] for row in await cursor.fetchall())
+        return found
+
+    async def count(self, exact: bool = False) -> int:
+        async with self.conn.execute("SELECT COUNT(*) FROM drawing_ideas") as cursor:
+            (total,) = await cursor.fetchone()
+        return total
+
+    async def upsert_ideas(self, ideas: List[DrawingIdea]) -> int:
+        async with self._write_lock:
+            try:
+                inserted = 0
+                for idea in ideas:
+                    if await self._insert(idea):
+                        inserted += 1
+                    else:
+                        await self._merge_tags(idea)
+            except sqlite3.Error:
+                await self.conn.rollback()
+                raise
+            await self.conn.commit()
+        return inserted
+
+    async def tag_counts(self) -> Dict[str, int]:
+        async with self.conn.execute("SELECT tag, COUNT(*) FROM idea_tags GROUP BY tag") as cursor:
+            return {tag: count for tag, count in await cursor.fetchall()}
+
+    async def get_seed_state(self, name: str) -> Optional[dict]:
+        async with self.conn.execute(
+            "SELECT fingerprint, keys FROM seed_state WHERE name = ?", (name,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return {"fingerprint": row[0], "keys": json.loads(row[1])} if row else None
+
+    async def save_seed_state(self, name: str, fingerprint: str, keys: list):
+        async with self._write_lock:
+            await self.conn.execute(
+                "INSERT INTO seed_state (name, fingerprint, keys) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET fingerprint = excluded.fingerprint, keys = excluded.keys",
+                (name, fingerprint, json.dumps(list(keys)))
+            )
+            await self.conn.commit()
+
+    async def get_schedule(self, name: str) -> Optional[dict]:
+        async with self.conn.execute("SELECT state FROM schedules WHERE name = ?", (name,)) as cursor:
+            row = await cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    async def save_schedule(self, name: str, state: dict):
+        async with self._write_lock:
+            await self.conn.execute(
+                "INSERT INTO schedules (name, state) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET state = excluded.state",
+                (name, json.dumps(state))
+            )
+            await self.conn.commit()
+
+    async def acquire_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        # Wall-clock time: the database file is shared by every worker process
+        now = time.time()
+        async with self._write_lock:
+            cursor = await self.conn.execute(
+                "INSERT INTO leases (name, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.expires_at <= ? OR leases.owner = excluded.owner",
+                (name, owner, now + ttl_seconds, now)
+            )
+            await self.conn.commit()
+            return cursor.rowcount > 0
+
+    async def release_lease(self, name: str, owner: str):
+        async with self._write_lock:
+            await self.conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+            await self.conn.commit()
+
+    async def increment_counters(self, deltas: Dict[str, List[int]]):
+        assignments = ", ".join(f"{field} = {field} + ?" for field in IDEA_COUNTER_FIELDS)
+        async with self._write_lock:
+            await self.conn.executemany(
+                f"UPDATE drawing_ideas SET {assignments} WHERE id = ?",
+                [(*amounts, idea_id) for idea_id, amounts in deltas.items()]
+            )
+            await self.conn.commit()
+
+    async def top_ideas(self, field: str, limit: int) -> List[dict]:
+        if field not in IDEA_COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter {field}")
+        async with self.conn.execute(
+            f"SELECT {COLUMNS}, {', '.join(IDEA_COUNTER_FIELDS)} FROM drawing_ideas "
+            f"WHERE {field} > 0 ORDER BY {field} DESC LIMIT ?",
+            (limit,)
+        ) as cursor:
+            return [
+                {**_row(row), **dict(zip(IDEA_COUNTER_FIELDS, row[len(COLUMN_NAMES):]))}
+                for row in await cursor.fetchall()
+            ]
+
+    async def get_version(self, name: str) -> int:
+        async with self.conn.execute("SELECT version FROM meta WHERE name = ?", (name,)) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row else 0
+
+    async def bump_version(self, name: str) -> int:
+        async with self._write_lock:
+            await self.conn.execute(
+                "INSERT INTO meta (name, version) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+                (name,)
+            )
+            await self.conn.commit()
+            return await self.get_version(name)
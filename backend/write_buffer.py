@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from models import DrawingIdea
+
+logger = logging.getLogger(__name__)
+
+# Writes a group of ideas, returning per idea whether it was inserted
+GroupWriter = Callable[[List[DrawingIdea]], Awaitable[List[bool]]]
+
+
+class IdeaWriteBuffer:
+    """Group commit for single-idea submissions
+
+    `submit` queues an idea and waits; one background writer takes whatever
+    has queued, waits up to `max_delay_seconds` for more (stopping early at
+    `max_batch`), and writes the group with one call, so a burst of POSTs
+    costs one insert_many instead of one round trip each. Every waiter gets
+    its own outcome: inserted, duplicate (the unique text_key still decides,
+    within the group too), or the exception that failed the whole group. At
+    most `max_pending` ideas wait; further submitters block until there is room.
+    """
+
+    def __init__(self, max_batch: int = 100, max_delay_seconds: float = 0.005, max_pending: int = 10000):
+        self.max_batch = max_batch
+        self.max_delay_seconds = max_delay_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._writer_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._writer_task is not None
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    async def submit(self, idea: DrawingIdea) -> bool:
+        """Write `idea` with the next group; False when it is a duplicate"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((idea, future))
+        return await future
+
+    def start(self, write: GroupWriter):
+        if self._writer_task is None:
+            self._writer_task = asyncio.create_task(self._run(write))
+
+    async def _collect(self) -> List[Tuple[DrawingIdea, asyncio.Future]]:
+        group = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_delay_seconds
+        while len(group) < self.max_batch:
+            if self._queue.empty():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    group.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                group.append(self._queue.get_nowait())
+        return group
+
+    async def _run(self, write: GroupWriter):
+        while True:
+            collected = await self._collect()
+            # Requests may have been cancelled (client gone) while queued
+            group = [(idea, future) for idea, future in collected if not future.done()]
+            try:
+                if group:
+                    inserted = await write([idea for idea, _ in group])
+                    for (_, future), ok in zip(group, inserted):
+                        if not future.done():
+                            future.set_result(ok)
+            except Exception as e:
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in collected:
+                    self._queue.task_done()
+
+    async def close(self):
+        """Write what is queued, then stop the writer"""
+        if self._writer_task is None:
+            return
+        await self._queue.join()
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        self._writer_task = None
@@ -10,11 +10,14 @@ import os
 from datetime import datetime
 import time
 
-# Get backend URL from frontend .env file
+# Get backend URL from the environment or the frontend .env file
 def get_backend_url():
-    """Read the backend URL from frontend .env file"""
+    """Read the backend URL from $BACKEND_URL or the frontend .env file"""
+    if os.environ.get('BACKEND_URL'):
+        return os.environ['BACKEND_URL']
+    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', '.env')
     try:
-        with open('/app/frontend/.env', 'r') as f:
+        with open(env_path, 'r') as f:
             for line in f:
                 if line.startswith('REACT_APP_BACKEND_URL='):
                     return line.split('=', 1)[1].strip()
@@ -169,6 +172,54 @@ def test_get_all_ideas():
     
     return results.summary()
 
+def test_paginated_ideas():
+    """Test GET /api/ideas keyset pagination"""
+    print("\n🔍 Testing Paginated Ideas Endpoint...")
+    results = TestResults()
+    
+    try:
+        seen_ids = []
+        cursor = None
+        for page in range(10):
+            params = {"limit": 5}
+            if cursor:
+                params["cursor"] = cursor
+            response = requests.get(f"{API_BASE}/ideas", params=params, timeout=10)
+            
+            if response.status_code != 200:
+                results.log_fail(f"Paginated ideas status code (page {page+1})", f"Expected 200, got {response.status_code}")
+                return results.summary()
+            
+            data = response.json()
+            if not isinstance(data, dict) or "items" not in data or "next_cursor" not in data:
+                results.log_fail("Paginated response format", f"Expected items/next_cursor object, got {type(data).__name__}")
+                return results.summary()
+            
+            if len(data["items"]) > 5:
+                results.log_fail("Page size", f"Expected at most 5 items, got {len(data['items'])}")
+            
+            seen_ids.extend(idea["id"] for idea in data["items"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+        
+        if len(seen_ids) == len(set(seen_ids)):
+            results.log_pass(f"Walked {len(seen_ids)} ideas across pages without repeats")
+        else:
+            results.log_fail("Pagination repeats", "Same idea returned on more than one page")
+        
+        # Test invalid cursor
+        response = requests.get(f"{API_BASE}/ideas", params={"cursor": "not-a-cursor"}, timeout=10)
+        if response.status_code == 400:
+            results.log_pass("Invalid cursor returns 400")
+        else:
+            results.log_fail("Invalid cursor status code", f"Expected 400, got {response.status_code}")
+            
+    except requests.exceptions.RequestException as e:
+        results.log_fail("Paginated ideas endpoint connection", str(e))
+    
+    return results.summary()
+
 def test_get_random_idea():
     """Test GET /api/ideas/random endpoint"""
     print("\n🔍 Testing Get Random Idea Endpoint...")
@@ -367,6 +418,7 @@ def run_all_tests():
     tests = [
         ("Health Check", test_health_endpoint),
         ("Get All Ideas", test_get_all_ideas),
+        ("Paginated Ideas", test_paginated_ideas),
         ("Get Random Idea", test_get_random_idea),
         ("Create New Idea", test_create_idea),
         ("Duplicate Idea Error", test_duplicate_idea_error),
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Latency of GET /api/ideas/search?prefix= autocomplete lookups
+
+Loads synthetic ideas into a RandomIdeaPool (through the in-memory storage
+backend, so no database is needed) and times prefix lookups as a user types
+them: the pool's sorted token index against a linear scan of every idea.
+Also times adding one idea to a warm index, which every POST /ideas does.
+
+    python benchmarks/bench_autocomplete.py --ideas 100000 --iterations 2000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from models import DrawingIdea
+from random_pool import RandomIdeaPool
+from search_index import tokenize
+from storage.memory import MemoryIdeaRepository
+
+SUBJECTS = [
+    "dragon", "sloth", "astronaut", "robot", "castle", "octopus", "wizard", "lighthouse",
+    "penguin", "volcano", "teapot", "samurai", "mermaid", "dinosaur", "submarine", "giraffe",
+]
+ACTIONS = [
+    "reading", "juggling", "painting", "skating", "baking", "surfing", "knitting", "dancing",
+]
+PLACES = [
+    "on the moon", "under the sea", "in a jungle", "at a market", "inside a snow globe",
+    "on a rooftop", "in a library", "during a thunderstorm",
+]
+
+
+def make_ideas(count):
+    rng = random.Random(42)
+    base = datetime.utcnow() - timedelta(days=1)
+    return [
+        DrawingIdea(
+            text=f"Draw a {rng.choice(SUBJECTS)} {rng.choice(ACTIONS)} {rng.choice(PLACES)} #{i}",
+            created_at=base + timedelta(milliseconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+def make_queries(count):
+    """What users type: 1-5 letters of a word, sometimes after a complete word"""
+    rng = random.Random(7)
+    words = SUBJECTS + ACTIONS
+    queries = []
+    for _ in range(count):
+        word = rng.choice(words)
+        typed = word[:rng.randint(1, 5)]
+        queries.append(f"{rng.choice(words)} {typed}" if rng.random() < 0.3 else typed)
+    return queries
+
+
+def linear_scan(ideas, query, limit):
+    terms = tokenize(query)
+    found = []
+    for idea in ideas:
+        tokens = tokenize(idea.text)
+        if all(any(token.startswith(term) for token in tokens) for term in terms):
+            found.append(idea)
+            if len(found) >= limit:
+                break
+    return found
+
+
+def time_calls(label, func, arguments):
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        func(argument)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{label:<28} mean {statistics.mean(samples):8.3f} ms   "
+          f"p50 {statistics.median(samples):8.3f} ms   p99 {p99:8.3f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=100000, help="number of ideas to load")
+    parser.add_argument("--iterations", type=int, default=1000, help="lookups per strategy")
+    parser.add_argument("--limit", type=int, default=10, help="suggestions per lookup")
+    args = parser.parse_args()
+
+    ideas = make_ideas(args.ideas)
+    repository = MemoryIdeaRepository()
+    await repository.insert_many(ideas)
+
+    pool = RandomIdeaPool()
+    start = time.perf_counter()
+    await pool.refresh(repository)
+    print(f"Pool warm-up (with token index): {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"for {len(pool)} ideas\n")
+
+    queries = make_queries(args.iterations)
+    time_calls("linear scan", lambda query: linear_scan(ideas, query, args.limit), queries[:200])
+    time_calls("RandomIdeaPool.complete", lambda query: pool.complete(query, args.limit), queries)
+
+    now = datetime.utcnow()
+    additions = [
+        {"id": str(uuid.uuid4()), "text": f"Sketch a new idea {i}", "created_at": now,
+         "user_submitted": True, "tags": []}
+        for i in range(args.iterations)
+    ]
+    time_calls("RandomIdeaPool.add", pool.add, additions)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
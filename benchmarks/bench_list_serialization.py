@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Per-request CPU cost of serializing the GET /api/ideas list
+
+"before" reproduces the original path: full documents (with _id and
+text_key) -> one DrawingIdeaResponse per row -> FastAPI response_model
+validation -> jsonable_encoder -> json.dumps.
+"after" is the fast path: rows already projected to the four response
+fields, encoded directly with orjson.
+
+Runs without a database; rows are synthetic.
+
+    python benchmarks/bench_list_serialization.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from models import IDEA_RESPONSE_FIELDS, DrawingIdeaResponse
+
+RESPONSE_FIELD = create_response_field(name="Response_get_all_ideas", type_=List[DrawingIdeaResponse])
+
+
+def make_documents(count):
+    base = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "id": str(uuid.uuid4()),
+            "text": f"Sketch idea number {i} with a reasonably descriptive prompt",
+            "text_key": f"sketch idea number {i} with a reasonably descriptive prompt",
+            "created_at": base - timedelta(milliseconds=i),
+            "user_submitted": bool(i % 2),
+            "tags": ["animals"] if i % 3 == 0 else [],
+        }
+        for i in range(count)
+    ]
+
+
+async def before(documents):
+    ideas = [DrawingIdeaResponse(**doc) for doc in documents]
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=ideas)
+    return JSONResponse(content).body
+
+
+async def after(rows):
+    return orjson.dumps(rows)
+
+
+async def cpu_ms(func, payload, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.process_time()
+        await func(payload)
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per size; the best is reported")
+    args = parser.parse_args()
+
+    print(f"{'ideas':>8}  {'before (ms)':>12}  {'after (ms)':>11}  {'speedup':>8}")
+    for size in args.sizes:
+        documents = make_documents(size)
+        rows = [{field: doc[field] for field in IDEA_RESPONSE_FIELDS} for doc in documents]
+        assert orjson.loads(await before(documents)) == orjson.loads(await after(rows))
+
+        slow = await cpu_ms(before, documents, args.repeat)
+        fast = await cpu_ms(after, rows, args.repeat)
+        print(f"{size:>8}  {slow:>12.2f}  {fast:>11.2f}  {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Cost and recall of the near-duplicate check done by POST /api/ideas
+
+Signs synthetic ideas into a NearDuplicateIndex, then looks up edited copies
+of random ideas (one word replaced, or case/punctuation changed) and reports
+lookup latency and how often the original was found, by true similarity.
+Runs without a database.
+
+    python benchmarks/bench_near_duplicates.py --ideas 100000 --lookups 2000
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from near_duplicates import NearDuplicateIndex, jaccard, shingles
+
+
+def make_texts(count, rng):
+    vocabulary = [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        for _ in range(5000)
+    ]
+    texts = [
+        "Draw a " + " ".join(rng.choice(vocabulary) for _ in range(rng.randint(4, 8)))
+        for _ in range(count)
+    ]
+    return texts, vocabulary
+
+
+def edit(text, vocabulary, rng):
+    if rng.random() < 0.3:
+        return "  " + text.upper() + "!"
+    words = text.split()
+    words[rng.randrange(2, len(words))] = rng.choice(vocabulary)
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=100000, help="number of ideas to index")
+    parser.add_argument("--lookups", type=int, default=2000, help="number of edited copies to look up")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    texts, vocabulary = make_texts(args.ideas, rng)
+    index = NearDuplicateIndex(texts.__getitem__)
+
+    start = time.perf_counter()
+    for position, text in enumerate(texts):
+        index.add(position, text)
+    elapsed = time.perf_counter() - start
+    print(f"Signed {len(texts)} ideas in {elapsed * 1000:.0f} ms ({elapsed / len(texts) * 1e6:.1f} us each)\n")
+
+    samples, found = [], {}
+    for _ in range(args.lookups):
+        original = rng.randrange(len(texts))
+        query = edit(texts[original], vocabulary, rng)
+        start = time.perf_counter()
+        matches = index.find(query, 0.0)
+        samples.append((time.perf_counter() - start) * 1000)
+        bucket = found.setdefault(round(jaccard(shingles(query), shingles(texts[original])), 1), [0, 0])
+        bucket[0] += any(position == original for position, _ in matches)
+        bucket[1] += 1
+
+    samples.sort()
+    print(f"lookup   p50 {samples[len(samples) // 2]:.3f} ms   p99 {samples[int(len(samples) * 0.99) - 1]:.3f} ms\n")
+    print("similarity  found")
+    for similarity, (hits, total) in sorted(found.items()):
+        print(f"{similarity:>10.1f}  {hits / total:6.1%} of {total}")
+
+
+if __name__ == "__main__":
+    main()
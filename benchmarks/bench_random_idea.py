@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Latency comparison for GET /api/ideas/random strategies
+
+Compares the original count_documents + $sample implementation against the
+in-memory RandomIdeaPool. Seeds a scratch database on the MongoDB configured in
+backend/.env and drops it afterwards.
+
+    python benchmarks/bench_random_idea.py --ideas 100000 --iterations 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from random_pool import RandomIdeaPool
+from storage.mongo import MongoIdeaRepository
+
+load_dotenv(BACKEND_DIR / '.env')
+
+
+async def legacy_random(collection):
+    """The pre-pool implementation: two round trips per pick"""
+    total = await collection.count_documents({})
+    if total == 0:
+        return None
+    cursor = collection.aggregate([{"$sample": {"size": 1}}])
+    ideas = await cursor.to_list(length=1)
+    return ideas[0] if ideas else None
+
+
+async def pooled_random(pool):
+    return pool.pick()
+
+
+async def seed(collection, count):
+    base = datetime.utcnow() - timedelta(days=1)
+    batch = []
+    for i in range(count):
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "text": f"Benchmark idea number {i}",
+            "text_key": f"benchmark idea number {i}",
+            "created_at": base + timedelta(milliseconds=i),
+            "user_submitted": True,
+        })
+        if len(batch) == 10000:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+
+
+async def time_calls(label, func, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(samples):8.3f} ms   "
+          f"p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ideas", type=int, default=10000, help="number of ideas to seed")
+    parser.add_argument("--iterations", type=int, default=1000, help="picks per strategy")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db_name = f"emalfdraw_bench_{uuid.uuid4().hex[:8]}"
+    repository = MongoIdeaRepository(client, db_name)
+    collection = repository.collection
+    try:
+        print(f"Seeding {args.ideas} ideas into {db_name}...")
+        await seed(collection, args.ideas)
+
+        pool = RandomIdeaPool()
+        start = time.perf_counter()
+        await pool.refresh(repository)
+        print(f"Pool warm-up: {(time.perf_counter() - start) * 1000:.1f} ms for {len(pool)} ideas\n")
+
+        await time_calls("count + $sample (legacy)", lambda: legacy_random(collection), args.iterations)
+        await time_calls("RandomIdeaPool.pick", lambda: pooled_random(pool), args.iterations)
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
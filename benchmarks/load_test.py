@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+EmalfDraw API load test
+
+Drives GET /api/ideas, GET /api/ideas/random and POST /api/ideas with a
+configurable request mix and concurrency, then reports throughput and
+p50/p95/p99 latency per operation and saves the results as JSON.
+
+By default the app runs in-process over an ASGI transport with the in-memory
+storage backend, so no server or database is needed. --backend picks another
+engine to compare per-backend latency: sqlite (temporary file), mongomock
+(the Mongo code path against mongomock-motor) or mongo (MONGO_URL/DB_NAME
+from backend/.env). Pass --base-url to hit a running deployment instead.
+--write-buffer turns on group commit for POST /api/ideas (IDEA_WRITE_BUFFER);
+compare a create-only mix with and without it for insert throughput and the
+latency each request pays waiting for its group.
+
+    python benchmarks/load_test.py --requests 5000 --concurrency 50 \\
+        --mix list=1,random=8,create=1 --backend sqlite --output bench_output.json
+    python benchmarks/load_test.py --mix create=1 --concurrency 200 --backend sqlite --write-buffer
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+OPERATIONS = {
+    "list": ("GET", "/api/ideas"),
+    "random": ("GET", "/api/ideas/random"),
+    "create": ("POST", "/api/ideas"),
+}
+
+DEFAULT_MIX = "list=1,random=8,create=1"
+
+IN_PROCESS_BACKENDS = ("memory", "sqlite", "mongomock", "mongo")
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for '{name}': {weight}")
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("Request mix needs at least one positive weight")
+    return mix
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_samples))))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(ms for ms, _ in samples)
+    statuses = defaultdict(int)
+    for _, status in samples:
+        statuses[str(status)] += 1
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else None,
+        },
+        "status_codes": dict(statuses),
+    }
+
+
+async def run_load(client, args):
+    names = list(args.mix)
+    weights = [args.mix[name] for name in names]
+    rng = random.Random(args.seed)
+    plan = rng.choices(names, weights=weights, k=args.requests)
+    samples = defaultdict(list)
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < len(plan):
+            name = plan[next_index]
+            next_index += 1
+            method, path = OPERATIONS[name]
+            kwargs = {}
+            if name == "create":
+                kwargs["json"] = {"text": f"Load test idea {uuid.uuid4().hex}"}
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            samples[name].append((round((time.perf_counter() - start) * 1000, 3), status))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    all_samples = [sample for name in samples for sample in samples[name]]
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "overall": summarize(all_samples, elapsed),
+        "operations": {name: summarize(samples[name], elapsed) for name in names if samples[name]},
+    }
+
+
+async def seed_extra_ideas(client, count):
+    """Grow the corpus beyond the defaults through the batch endpoint"""
+    for start in range(0, count, 1000):
+        size = min(1000, count - start)
+        batch = [{"text": f"Seeded benchmark idea {start + i} {uuid.uuid4().hex[:8]}"} for i in range(size)]
+        response = await client.post("/api/ideas/batch", json=batch)
+        response.raise_for_status()
+
+
+def build_repository(backend, workdir):
+    from storage import create_repository
+
+    if backend == "sqlite":
+        from storage.sqlite import SQLiteIdeaRepository
+        return SQLiteIdeaRepository(str(Path(workdir) / "load_test.db"))
+    if backend == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        from storage.mongo import MongoIdeaRepository
+        return MongoIdeaRepository(AsyncMongoMockClient(), "emalfdraw_load_test")
+    return create_repository(backend)
+
+
+async def run_in_process(args):
+    sys.path.insert(0, str(BACKEND_DIR))
+    # Keep importing server from trying to build the default Mongo repository
+    os.environ['STORAGE_BACKEND'] = "memory"
+    if args.write_buffer:
+        os.environ['IDEA_WRITE_BUFFER'] = "true"
+    import server
+
+    # Per-request client logging would dominate the measurement
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Swap in the requested storage backend before startup runs
+        server.repository = build_repository(args.backend, workdir)
+
+        transport = httpx.ASGITransport(app=server.app)
+        async with server.app.router.lifespan_context(server.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+                if args.seed_ideas:
+                    await seed_extra_ideas(client, args.seed_ideas)
+                return await run_load(client, args)
+
+
+async def run_against_url(args):
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        if args.seed_ideas:
+            await seed_extra_ideas(client, args.seed_ideas)
+        return await run_load(client, args)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def print_report(results):
+    print(f"\n{'operation':<10} {'requests':>9} {'errors':>7} {'req/s':>9} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    rows = list(results["operations"].items()) + [("overall", results["overall"])]
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        print(f"{name:<10} {stats['requests']:>9} {stats['errors']:>7} {stats['throughput_rps']:>9} "
+              f"{latency['p50']:>9} {latency['p95']:>9} {latency['p99']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="total requests to send")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent in-flight requests")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"weighted request mix (default {DEFAULT_MIX})")
+    parser.add_argument("--seed-ideas", type=int, default=0, help="extra ideas to create before measuring")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the request plan")
+    parser.add_argument("--backend", choices=IN_PROCESS_BACKENDS, default="memory",
+                        help="storage backend for in-process runs (default memory)")
+    parser.add_argument("--write-buffer", action="store_true",
+                        help="group-commit POST /api/ideas in in-process runs (IDEA_WRITE_BUFFER)")
+    parser.add_argument("--base-url", help="run against a live server instead of in-process")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout with --base-url")
+    parser.add_argument("--output", help="write results JSON to this file")
+    args = parser.parse_args()
+
+    runner = run_against_url(args) if args.base_url else run_in_process(args)
+    results = asyncio.run(runner)
+    results["config"] = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        "seed_ideas": args.seed_ideas,
+        "write_buffer": args.write_buffer,
+        "target": args.base_url or f"in-process ({args.backend})",
+    }
+    results["environment"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+    print_report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
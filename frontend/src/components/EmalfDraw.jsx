@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { RefreshCw, Plus, Palette } from 'lucide-react';
 import { Button } from './ui/button';
 import { Input } from './ui/input';
@@ -10,6 +10,15 @@ import axios from 'axios';
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Challenges fetched ahead of time so "New Challenge" doesn't wait on the network
+const PREFETCH_SIZE = 10;
+const PREFETCH_LOW_WATER = 3;
+// Recently shown ideas the server is asked to skip
+const MAX_EXCLUDED = 50;
+// Typing pause before looking up similar ideas, in milliseconds
+const SUGGEST_DELAY_MS = 150;
+const MAX_SUGGESTIONS = 5;
+
 const EmalfDraw = () => {
   const [currentIdea, setCurrentIdea] = useState('');
   const [allIdeas, setAllIdeas] = useState([]);
@@ -17,12 +26,78 @@ const EmalfDraw = () => {
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [isAnimating, setIsAnimating] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
+  const [tags, setTags] = useState([]);
+  const [selectedTag, setSelectedTag] = useState(null);
+  const [suggestions, setSuggestions] = useState([]);
+  const selectedTagRef = useRef(null);
+  const challengeQueue = useRef([]);
+  const recentIds = useRef([]);
+  const pendingRefill = useRef(null);
 
   // Load ideas from backend API
   useEffect(() => {
     loadIdeas();
+    loadTags();
+  }, []);
+
+  // Follow ideas added by everyone else instead of polling the full list
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') return undefined;
+
+    const source = new EventSource(`${API}/ideas/stream`);
+    source.addEventListener('idea', (event) => {
+      const { idea } = JSON.parse(event.data);
+      addIdeaToList(idea);
+    });
+    // Bulk additions and missed events: fetch the list again
+    source.addEventListener('count', () => reloadIdeas());
+    source.addEventListener('resync', () => reloadIdeas());
+    // The server ends streams every few minutes; catch up on what was missed while reconnecting
+    let connected = false;
+    source.addEventListener('open', () => {
+      if (connected) reloadIdeas();
+      connected = true;
+    });
+    return () => source.close();
   }, []);
 
+  // Show existing ideas matching what is being typed, so duplicates are spotted early
+  useEffect(() => {
+    const prefix = newIdea.trim();
+    if (!isDialogOpen || prefix.length < 2) {
+      setSuggestions([]);
+      return undefined;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${API}/ideas/search`, {
+          params: { prefix, limit: MAX_SUGGESTIONS }
+        });
+        if (!cancelled) setSuggestions(response.data);
+      } catch (error) {
+        console.error('Error searching ideas:', error);
+      }
+    }, SUGGEST_DELAY_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [newIdea, isDialogOpen]);
+
+  const addIdeaToList = (idea) => {
+    setAllIdeas(prev => (prev.some(existing => existing.id === idea.id) ? prev : [idea, ...prev]));
+  };
+
+  const reloadIdeas = async () => {
+    try {
+      const response = await axios.get(`${API}/ideas`);
+      setAllIdeas(response.data);
+    } catch (error) {
+      console.error('Error reloading ideas:', error);
+    }
+  };
+
   const loadIdeas = async () => {
     try {
       setIsLoading(true);
@@ -33,7 +108,9 @@ const EmalfDraw = () => {
       if (response.data.length > 0) {
         const randomIndex = Math.floor(Math.random() * response.data.length);
         setCurrentIdea(response.data[randomIndex].text);
+        rememberShown(response.data[randomIndex].id);
       }
+      refillQueue().catch((error) => console.error('Error prefetching ideas:', error));
     } catch (error) {
       console.error('Error loading ideas:', error);
       toast({
@@ -46,17 +123,72 @@ const EmalfDraw = () => {
     }
   };
 
-  // Get random idea with smooth animation from backend
+  // Themes are optional: the page works without them
+  const loadTags = async () => {
+    try {
+      const response = await axios.get(`${API}/tags`);
+      setTags(response.data);
+    } catch (error) {
+      console.error('Error loading tags:', error);
+    }
+  };
+
+  const rememberShown = (id) => {
+    recentIds.current = [...recentIds.current, id].slice(-MAX_EXCLUDED);
+  };
+
+  // Top up the challenge queue with ideas not shown recently or already queued
+  const refillQueue = () => {
+    if (pendingRefill.current) return pendingRefill.current;
+
+    const tag = selectedTagRef.current;
+    const exclude = [...recentIds.current, ...challengeQueue.current.map((idea) => idea.id)];
+    pendingRefill.current = axios
+      .get(`${API}/ideas/random`, {
+        params: { count: PREFETCH_SIZE, exclude: exclude.join(','), tag: tag || undefined },
+      })
+      .then((response) => {
+        // The theme changed while this was in flight
+        if (tag !== selectedTagRef.current) return;
+        const queued = new Set(challengeQueue.current.map((idea) => idea.id));
+        challengeQueue.current.push(...response.data.filter((idea) => !queued.has(idea.id)));
+      })
+      .finally(() => {
+        pendingRefill.current = null;
+      });
+    return pendingRefill.current;
+  };
+
+  const nextChallenge = async () => {
+    if (challengeQueue.current.length === 0) {
+      await refillQueue();
+    }
+    if (challengeQueue.current.length === 0) {
+      // Everything was shown recently: start over
+      recentIds.current = [];
+      await refillQueue();
+    }
+    const idea = challengeQueue.current.shift();
+    if (!idea) throw new Error('No ideas available');
+
+    if (challengeQueue.current.length <= PREFETCH_LOW_WATER) {
+      refillQueue().catch((error) => console.error('Error prefetching ideas:', error));
+    }
+    return idea;
+  };
+
+  // Get random idea with smooth animation, served from the prefetched queue
   const getRandomIdea = async () => {
     if (isAnimating || isLoading) return;
     
     setIsAnimating(true);
     
     try {
-      const response = await axios.get(`${API}/ideas/random`);
+      const idea = await nextChallenge();
+      rememberShown(idea.id);
       
       setTimeout(() => {
-        setCurrentIdea(response.data.text);
+        setCurrentIdea(idea.text);
         setIsAnimating(false);
       }, 300);
     } catch (error) {
@@ -70,6 +202,16 @@ const EmalfDraw = () => {
     }
   };
 
+  // Switch theme: drop challenges queued for the old one and show one from the new theme
+  const chooseTag = async (tag) => {
+    if (tag === selectedTagRef.current || isAnimating || isLoading) return;
+    selectedTagRef.current = tag;
+    setSelectedTag(tag);
+    challengeQueue.current = [];
+    await pendingRefill.current?.catch(() => {});
+    getRandomIdea();
+  };
+
   // Add new idea to backend
   const addNewIdea = async () => {
     if (!newIdea.trim()) {
@@ -86,8 +228,8 @@ const EmalfDraw = () => {
         text: newIdea.trim()
       });
 
-      // Update local state with new idea
-      setAllIdeas(prev => [response.data, ...prev]);
+      // Update local state with new idea (the stream may have delivered it already)
+      addIdeaToList(response.data);
       
       toast({
         title: "Success!",
@@ -172,6 +314,25 @@ const EmalfDraw = () => {
             </div>
           </div>
 
+          {/* Themes */}
+          {tags.length > 0 && (
+            <div className="flex flex-wrap gap-2 justify-center mb-6">
+              {[null, ...tags.map(({ tag }) => tag)].map((tag) => (
+                <button
+                  key={tag || 'all'}
+                  onClick={() => chooseTag(tag)}
+                  className={`px-4 py-1.5 rounded-full border text-sm transition-colors duration-300 ${
+                    selectedTag === tag
+                      ? 'bg-yellow-400 border-yellow-400 text-black'
+                      : 'border-yellow-400/30 text-gray-300 hover:border-yellow-400 hover:text-yellow-400'
+                  }`}
+                >
+                  {tag || 'All'}
+                </button>
+              ))}
+            </div>
+          )}
+
           {/* Action Buttons */}
           <div className="flex flex-col sm:flex-row gap-4 justify-center items-center">
             <Button
@@ -207,6 +368,16 @@ const EmalfDraw = () => {
                     className="bg-black border-yellow-400/30 text-white placeholder-gray-500 focus:border-yellow-400"
                     onKeyPress={(e) => e.key === 'Enter' && addNewIdea()}
                   />
+                  {suggestions.length > 0 && (
+                    <div className="text-sm text-gray-400">
+                      <p className="mb-1">Similar ideas already shared:</p>
+                      <ul className="space-y-1">
+                        {suggestions.map(idea => (
+                          <li key={idea.id} className="text-gray-300">{idea.text}</li>
+                        ))}
+                      </ul>
+                    </div>
+                  )}
                   <div className="flex gap-3 justify-end">
                     <Button
                       variant="outline"
@@ -0,0 +1,55 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Keep importing server from building the default Mongo repository
+os.environ["STORAGE_BACKEND"] = "memory"
+os.environ.setdefault("METRICS_ENABLED", "false")
+
+from storage.memory import MemoryIdeaRepository  # noqa: E402
+from storage.sqlite import SQLiteIdeaRepository  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def repository(request, tmp_path):
+    """Every storage backend that runs without a server, set up and empty"""
+    if request.param == "memory":
+        repo = MemoryIdeaRepository()
+    else:
+        repo = SQLiteIdeaRepository(str(tmp_path / "ideas.db"))
+    await repo.setup()
+    try:
+        yield repo
+    finally:
+        await repo.close()
+
+
+@pytest.fixture
+async def server():
+    """A freshly imported server module on the memory backend, started up
+
+    Reloading gives every test its own repository, pool, caches and breaker.
+    """
+    import server as module
+    module = importlib.reload(module)
+    async with module.app.router.lifespan_context(module.app):
+        yield module
+
+
+@pytest.fixture
+async def client(server):
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
@@ -0,0 +1,116 @@
+"""Idea routes over ASGI, on the memory backend"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from data import DEFAULT_DRAWING_IDEAS
+from pagination import decode_cursor, encode_cursor
+from random_pool import RandomIdeaPool
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_list_returns_seeded_ideas(client):
+    response = await client.get("/api/ideas")
+    assert response.status_code == 200
+    assert {idea["text"] for idea in response.json()} == set(DEFAULT_DRAWING_IDEAS)
+
+
+async def test_create_then_duplicate(client):
+    response = await client.post("/api/ideas", json={"text": "  Draw a unicorn riding a bicycle "})
+    assert response.status_code == 200
+    created = response.json()
+    assert created["text"] == "Draw a unicorn riding a bicycle"
+    assert created["user_submitted"] is True
+
+    response = await client.post("/api/ideas", json={"text": "draw a UNICORN riding a bicycle"})
+    assert response.status_code == 409
+
+
+async def test_pagination_walks_every_idea(client):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/ideas", params=params)).json()
+        seen += [idea["id"] for idea in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == len(DEFAULT_DRAWING_IDEAS)
+
+    assert (await client.get("/api/ideas", params={"cursor": "not-a-cursor"})).status_code == 400
+
+
+async def test_cursor_with_an_offset_is_read_as_utc(client):
+    first = (await client.get("/api/ideas", params={"limit": 7})).json()
+    last = first["items"][-1]
+    naive = datetime.fromisoformat(last["created_at"])
+    aware = naive.replace(tzinfo=timezone.utc).astimezone(timezone(timedelta(hours=2)))
+    assert decode_cursor(encode_cursor(aware, last["id"])) == (naive, last["id"])
+
+    expected = (await client.get("/api/ideas", params={"limit": 7, "cursor": first["next_cursor"]})).json()
+    response = await client.get("/api/ideas", params={"limit": 7, "cursor": encode_cursor(aware, last["id"])})
+    assert response.status_code == 200
+    assert response.json() == expected
+
+
+async def test_etag_revalidation(client):
+    first = await client.get("/api/ideas")
+    etag = first.headers["etag"]
+    assert (await client.get("/api/ideas", headers={"If-None-Match": etag})).status_code == 304
+
+    await client.post("/api/ideas", json={"text": "Draw a brand new idea"})
+    assert (await client.get("/api/ideas", headers={"If-None-Match": etag})).status_code == 200
+
+
+async def test_batch_reports_status_per_item(client):
+    response = await client.post("/api/ideas/batch", json=[
+        {"text": "Draw a batch idea"},
+        {"text": "draw a batch idea"},
+        {"text": ""},
+        {"text": DEFAULT_DRAWING_IDEAS[0]},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["status"] for item in body["results"]] == ["created", "duplicate", "invalid", "duplicate"]
+    assert (body["created"], body["duplicates"], body["invalid"]) == (1, 2, 1)
+
+
+async def test_random_prefetch_excludes_ids(client):
+    ideas = (await client.get("/api/ideas")).json()
+    keep = ideas[0]["id"]
+    exclude = [idea["id"] for idea in ideas if idea["id"] != keep]
+    response = await client.get("/api/ideas/random", params={"count": 3, "exclude": ",".join(exclude)})
+    assert response.status_code == 200
+    assert [idea["id"] for idea in response.json()] == [keep]
+
+
+async def test_import_normalizes_timestamps_and_skips_taken_ids(client):
+    existing = (await client.get("/api/ideas")).json()[0]
+    body = b"\n".join([
+        b'{"text": "Imported with offset", "created_at": "2025-01-09T10:30:00+05:00"}',
+        b'{"text": "Imported in UTC", "created_at": "2025-01-09T10:30:00Z"}',
+        b'{"id": "' + existing["id"].encode() + b'", "text": "Different text, taken id"}',
+    ])
+    response = await client.post("/api/ideas/import", content=body)
+    assert response.status_code == 200
+    assert response.json()["imported"] == 2
+    assert response.json()["duplicates"] == 1
+
+    ideas = {idea["text"]: idea for idea in (await client.get("/api/ideas")).json()}
+    assert ideas["Imported with offset"]["created_at"] == "2025-01-09T05:30:00"
+    assert ideas["Imported in UTC"]["created_at"] == "2025-01-09T10:30:00"
+    assert "Different text, taken id" not in ideas
+    assert ideas[existing["text"]]["id"] == existing["id"]
+
+
+async def test_drawn_rejects_ids_the_pool_does_not_know(server, client, monkeypatch):
+    known = (await client.get("/api/ideas")).json()[0]["id"]
+    assert (await client.post(f"/api/ideas/{known}/drawn")).status_code == 204
+    assert (await client.post("/api/ideas/made-up/drawn")).status_code == 404
+    assert len(server.popularity) == 1
+
+    # While the pool is still loading, ids are taken on trust
+    monkeypatch.setattr(server, "random_pool", RandomIdeaPool())
+    assert (await client.post("/api/ideas/made-up/drawn")).status_code == 204
+    assert len(server.popularity) == 2
@@ -0,0 +1,84 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, UnavailableError
+
+pytestmark = pytest.mark.anyio
+
+
+async def fail(error: BaseException):
+    raise error
+
+
+async def succeed():
+    return "ok"
+
+
+def make_breaker(**options):
+    return CircuitBreaker(
+        "test", failure_threshold=2, reset_seconds=60, timeout_seconds=0.01,
+        failures=(sqlite3.OperationalError,), **options
+    )
+
+
+async def test_availability_errors_open_the_breaker():
+    breaker = make_breaker()
+    with pytest.raises(UnavailableError):
+        await breaker.call(fail(sqlite3.OperationalError("database is locked")))
+    assert breaker.state == CLOSED
+    with pytest.raises(UnavailableError):
+        await breaker.call(asyncio.sleep(1))
+    assert breaker.state == OPEN
+
+    # Refused without running the call
+    operation = succeed()
+    with pytest.raises(UnavailableError) as refused:
+        await breaker.call(operation)
+    assert refused.value.retry_after > 1
+    assert operation.cr_frame is None
+
+
+async def test_other_errors_pass_through_and_do_not_count():
+    breaker = make_breaker()
+    for _ in range(5):
+        with pytest.raises(ValueError):
+            await breaker.call(fail(ValueError("bad input")))
+    assert breaker.state == CLOSED
+
+    # Nor do they reset a run of real failures
+    with pytest.raises(UnavailableError):
+        await breaker.call(fail(sqlite3.OperationalError("disk I/O error")))
+    with pytest.raises(KeyError):
+        await breaker.call(fail(KeyError("id")))
+    with pytest.raises(UnavailableError):
+        await breaker.call(fail(sqlite3.OperationalError("disk I/O error")))
+    assert breaker.state == OPEN
+
+
+async def test_half_open_trial_closes_or_reopens():
+    breaker = make_breaker()
+    for _ in range(2):
+        with pytest.raises(UnavailableError):
+            await breaker.call(fail(sqlite3.OperationalError("database is locked")))
+    breaker.reset_seconds = 0
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(UnavailableError):
+        await breaker.call(fail(sqlite3.OperationalError("database is locked")))
+    assert breaker._opened_at is not None
+
+    assert await breaker.call(succeed()) == "ok"
+    assert breaker.state == CLOSED
+
+
+async def test_failing_requests_do_not_trip_the_database_breaker(server, client, monkeypatch):
+    async def broken_create(idea):
+        raise ValueError("rejected by a storage-side validator")
+
+    monkeypatch.setattr(server.repository, "create", broken_create)
+    for index in range(server.database_breaker.failure_threshold + 1):
+        response = await client.post("/api/ideas", json={"text": f"Draw broken idea {index}"})
+        assert response.status_code == 500
+    assert server.database_breaker.state == CLOSED
+    assert (await client.get("/api/ideas/top")).status_code == 200
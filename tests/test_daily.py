@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from daily import DailyChallengeSchedule, extend_schedule, next_midnight
+from models import DrawingIdea
+from random_pool import RandomIdeaPool
+
+pytestmark = pytest.mark.anyio
+
+TODAY = date(2026, 10, 17)
+
+
+async def add_ideas(repository, count, prefix="Draw idea"):
+    ideas = [DrawingIdea(text=f"{prefix} {i}") for i in range(count)]
+    await repository.insert_many(ideas)
+    return ideas
+
+
+def days(first, count):
+    return [first + timedelta(days=offset) for offset in range(count)]
+
+
+def test_no_idea_repeats_within_a_cycle():
+    ids = [f"idea-{i}" for i in range(5)]
+    state = extend_schedule(None, ids, TODAY, TODAY + timedelta(days=11))
+    picked = [state["days"][day.isoformat()] for day in days(TODAY, 12)]
+    assert sorted(picked[:5]) == ids
+    assert sorted(picked[5:10]) == ids
+    assert state["cycle"] == 2 and len(state["used"]) == 2
+
+
+def test_extending_keeps_scheduled_days_and_the_cycle():
+    ids = [f"idea-{i}" for i in range(6)]
+    state = extend_schedule(None, ids, TODAY, TODAY + timedelta(days=2))
+    # A new idea arrives; the next days finish the cycle, new idea included
+    later = extend_schedule(state, ids + ["idea-new"], TODAY + timedelta(days=1), TODAY + timedelta(days=6))
+    assert TODAY.isoformat() not in later["days"]
+    for day in days(TODAY + timedelta(days=1), 2):
+        assert later["days"][day.isoformat()] == state["days"][day.isoformat()]
+    cycle = [state["days"][TODAY.isoformat()]] + [later["days"][day.isoformat()] for day in days(TODAY + timedelta(days=1), 6)]
+    assert sorted(cycle) == sorted(ids + ["idea-new"])
+
+
+async def test_workers_built_apart_agree(repository):
+    await add_ideas(repository, 20)
+    first_pool, first = RandomIdeaPool(), DailyChallengeSchedule(horizon_days=30)
+    await first.rebuild(repository, first_pool, "worker-a", today=TODAY)
+
+    # One more submission, then a second worker (or a restart) builds its schedule
+    await add_ideas(repository, 1, prefix="Late idea")
+    second_pool, second = RandomIdeaPool(), DailyChallengeSchedule(horizon_days=30)
+    await second.rebuild(repository, second_pool, "worker-b", today=TODAY)
+
+    for day in days(TODAY - timedelta(days=1), 32):
+        assert first.get(day) is not None
+        assert first.get(day) == second.get(day)
+
+
+async def test_next_day_extends_without_changing_known_days(repository):
+    await add_ideas(repository, 10)
+    pool, schedule = RandomIdeaPool(), DailyChallengeSchedule(horizon_days=3)
+    await schedule.rebuild(repository, pool, "worker-a", today=TODAY)
+    known = {day: schedule.get(day) for day in days(TODAY, 4)}
+
+    await schedule.rebuild(repository, pool, "worker-a", today=TODAY + timedelta(days=1))
+    for day, idea in known.items():
+        assert schedule.get(day) == idea
+    assert schedule.get(TODAY + timedelta(days=4)) is not None
+    assert schedule.get(TODAY - timedelta(days=1)) is None
+
+
+async def test_empty_corpus_schedules_nothing(repository):
+    schedule = DailyChallengeSchedule()
+    await schedule.rebuild(repository, RandomIdeaPool(), "worker-a", today=TODAY)
+    assert schedule.get(TODAY) is None
+    assert await repository.get_schedule("daily_challenge") is None
+
+
+def test_next_midnight_is_local():
+    zone = timezone(timedelta(hours=-5))
+    now = datetime(2026, 10, 17, 23, 30, tzinfo=zone)
+    assert next_midnight(now) == datetime(2026, 10, 18, tzinfo=zone)
+
+
+async def test_daily_route_is_cacheable(client):
+    response = await client.get("/api/ideas/daily", params={"tz": "Europe/Paris"})
+    assert response.status_code == 200
+    assert response.json()["timezone"] == "Europe/Paris"
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert (await client.get("/api/ideas/daily", params={"tz": "Mars/Olympus"})).status_code == 400
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import idea_stream
+from idea_stream import RESYNC_EVENT, IdeaStreamHub, TooManySubscribersError
+from profiling import ProfilingMiddleware
+
+pytestmark = pytest.mark.anyio
+
+IDEA = {"id": "idea-1", "text": "Draw a cat"}
+
+
+class WatchOnce:
+    """Insert stream that opens, delivers one idea and fails; it never opens again"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def watch_inserts(self):
+        self.calls += 1
+        if self.calls == 1:
+            yield None
+            yield IDEA
+        raise RuntimeError("not a replica set")
+
+
+async def collect(hub, queue):
+    return [frame async for frame in hub.events(queue)]
+
+
+async def test_stream_ends_after_its_lifetime():
+    hub = IdeaStreamHub(heartbeat_seconds=0.01, max_stream_seconds=0.05)
+    queue = hub.subscribe()
+    frames = await asyncio.wait_for(collect(hub, queue), 1)
+    assert frames[0].startswith(b"retry:")
+    assert len(hub) == 0
+
+
+async def test_close_ends_every_stream():
+    hub = IdeaStreamHub(queue_size=1, max_stream_seconds=60)
+    readers = [asyncio.create_task(collect(hub, hub.subscribe())) for _ in range(3)]
+    await asyncio.sleep(0)
+    # A full queue still gets the end of stream
+    hub.publish_idea(IDEA)
+    await hub.close()
+    for frames in await asyncio.wait_for(asyncio.gather(*readers), 1):
+        assert frames[0].startswith(b"retry:")
+    assert len(hub) == 0
+    with pytest.raises(TooManySubscribersError):
+        hub.subscribe()
+
+
+async def test_lost_change_stream_falls_back_to_local_publishing(monkeypatch):
+    monkeypatch.setattr(idea_stream, "CHANGE_STREAM_RETRY_SECONDS", 0.001)
+    hub = IdeaStreamHub()
+    queue = hub.subscribe()
+    source = WatchOnce()
+    hub.start_change_stream(source)
+    while source.calls < 4:
+        await asyncio.sleep(0.001)
+
+    assert not hub.uses_change_stream
+    frames = [queue.get_nowait() for _ in range(queue.qsize())]
+    # The idea it delivered, then a single resync however often it fails to restart
+    assert frames[0].startswith(b"event: idea")
+    assert frames[1:] == [RESYNC_EVENT]
+    await hub.close()
+
+
+async def test_change_stream_that_never_opens_sends_no_resync(monkeypatch):
+    monkeypatch.setattr(idea_stream, "CHANGE_STREAM_RETRY_SECONDS", 0.001)
+    source = WatchOnce()
+    source.calls = 1
+    hub = IdeaStreamHub()
+    queue = hub.subscribe()
+    hub.start_change_stream(source)
+    while source.calls < 4:
+        await asyncio.sleep(0.001)
+    assert not hub.uses_change_stream
+    assert queue.empty()
+    await hub.close()
+
+
+def test_profiler_skips_the_stream():
+    middleware = ProfilingMiddleware(None, directory="unused", sample_rate=1.0)
+    assert middleware._opted_in({"type": "http", "path": "/api/ideas"})
+    assert not middleware._opted_in({"type": "http", "path": "/api/ideas/stream"})
+    assert not middleware._opted_in({"type": "http", "path": "/api/health/live"})
@@ -0,0 +1,50 @@
+import pytest
+
+from list_cache import GZIP_MIN_BYTES, CollectionVersion, SerializedBodyCache, etag_for, etag_matches
+from storage.memory import MemoryIdeaRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False),
+    ("", False),
+    ('W/"ideas-3"', True),
+    ('"ideas-3"', True),
+    ('"ideas-2", W/"ideas-3"', True),
+    ('"ideas-2" , "ideas-4"', False),
+    ("*", True),
+    ('W/"ideas-30"', False),
+])
+def test_etag_matches_weakly(if_none_match, expected):
+    assert etag_matches(if_none_match, etag_for(3)) is expected
+
+
+def test_body_cache_keeps_newest_version():
+    cache = SerializedBodyCache()
+    assert cache.get(1) is None
+
+    body = b"x" * GZIP_MIN_BYTES
+    cache.put(2, body)
+    identity, compressed = cache.get(2)
+    assert identity == body and compressed is not None
+
+    # A slow rebuild of an older version is returned but not cached
+    assert cache.put(1, b"[]") == (b"[]", None)
+    assert cache.get(1) is None
+    assert cache.get(2)[0] == body
+
+
+async def test_collection_version_reuses_value_within_interval():
+    repository = MemoryIdeaRepository()
+    version = CollectionVersion("drawing_ideas", sync_interval_seconds=60)
+    assert await version.current(repository) == 0
+
+    # Another process bumps; this one keeps its value until the interval passes
+    await repository.bump_version("drawing_ideas")
+    assert await version.current(repository) == 0
+    version.sync_interval_seconds = -1
+    assert await version.current(repository) == 1
+
+    # Its own writes are visible at once
+    assert await version.bump(repository) == 2
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import _csot
+from pymongo.errors import ExecutionTimeout
+
+from migrations import TEXT_KEY_INDEX, backfill_text_keys
+from storage.mongo import MongoIdeaRepository
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1)
+
+
+async def keys(collection):
+    return {doc["id"]: doc["text_key"] async for doc in collection.find({}, {"id": 1, "text_key": 1})}
+
+
+async def test_backfill_suffixes_colliding_keys():
+    collection = AsyncMongoMockClient()["test"]["drawing_ideas"]
+    await collection.insert_many([
+        {"id": "old", "text": "Cat", "created_at": START},
+        {"id": "new", "text": "cat ", "created_at": START + timedelta(days=1)},
+    ])
+    assert await backfill_text_keys(collection) == 2
+    assert await keys(collection) == {"old": "cat", "new": "cat#new"}
+
+
+async def test_collisions_left_by_an_interrupted_run_are_resolved():
+    collection = AsyncMongoMockClient()["test"]["drawing_ideas"]
+    # Keys backfilled, but the run stopped before resolving collisions
+    await collection.insert_many([
+        {"id": "old", "text": "Cat", "text_key": "cat", "created_at": START},
+        {"id": "new", "text": "cat ", "text_key": "cat", "created_at": START + timedelta(days=1)},
+    ])
+    assert await backfill_text_keys(collection) == 0
+    assert await keys(collection) == {"old": "cat", "new": "cat#new"}
+
+    # Once the unique index exists there is nothing left to check
+    await collection.create_index("text_key", unique=True, name=TEXT_KEY_INDEX)
+    await collection.insert_one({"id": "other", "text": "Dog", "text_key": "dog", "created_at": START})
+    assert await backfill_text_keys(collection) == 0
+
+
+async def test_setup_builds_every_index_it_can_under_the_setup_budget(monkeypatch):
+    repository = MongoIdeaRepository(AsyncMongoMockClient(), "test", setup_timeout_seconds=1234)
+    budgets = []
+
+    async def migrations(db):
+        budgets.append(_csot.get_timeout())
+
+    create_index = repository.collection.create_index
+
+    async def flaky_create_index(keys, **options):
+        if options["name"] == TEXT_KEY_INDEX:
+            raise ExecutionTimeout("operation exceeded time limit")
+        return await create_index(keys, **options)
+
+    monkeypatch.setattr("storage.mongo.run_migrations", migrations)
+    monkeypatch.setattr(repository.collection, "create_index", flaky_create_index)
+    await repository.setup()
+
+    assert budgets == [1234]
+    indexes = await repository.collection.index_information()
+    assert TEXT_KEY_INDEX not in indexes
+    assert {"created_at_id", "id_unique", "served_count_desc"} <= set(indexes)
@@ -0,0 +1,58 @@
+import gzip
+from datetime import datetime
+
+import orjson
+import pytest
+
+from ndjson_io import MAX_LINE_BYTES, NDJSONLineError, export_chunks, iter_lines
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def parse(data: bytes, size: int = 7):
+    return [item async for item in iter_lines(chunked(data, size))]
+
+
+async def test_lines_split_across_chunks():
+    data = b'{"text": "one"}\n\n{"text": "two"}\n{"text": "three"}'
+    assert await parse(data) == [(1, {"text": "one"}), (3, {"text": "two"}), (4, {"text": "three"})]
+
+
+async def test_gzip_body_is_detected():
+    data = gzip.compress(b'{"text": "one"}\n{"text": "two"}\n')
+    assert [value for _, value in await parse(data, size=5)] == [{"text": "one"}, {"text": "two"}]
+
+
+async def test_bad_lines_are_reported_and_skipped():
+    data = b'not json\n[1, 2]\n{"text": "ok"}\n'
+    items = await parse(data)
+    assert [(number, str(value)) for number, value in items[:2]] == [
+        (1, "Invalid JSON"), (2, "Expected a JSON object")
+    ]
+    assert all(isinstance(value, NDJSONLineError) for _, value in items[:2])
+    assert items[2] == (3, {"text": "ok"})
+
+
+async def test_oversized_line_is_dropped_without_buffering():
+    data = b'{"text": "' + b"x" * (MAX_LINE_BYTES * 2) + b'"}\n{"text": "after"}\n'
+    items = await parse(data, size=4096)
+    assert str(items[0][1]) == "Line too long"
+    assert items[1:] == [(2, {"text": "after"})]
+
+
+async def test_export_round_trips_through_import():
+    docs = [{"id": str(i), "text": f"Idea {i}", "created_at": datetime(2025, 1, 9, 10, i)} for i in range(50)]
+
+    async def source():
+        for doc in docs:
+            yield doc
+
+    for compress in (False, True):
+        body = b"".join([chunk async for chunk in export_chunks(source(), compress=compress)])
+        parsed = [value for _, value in await parse(body, size=100)]
+        assert parsed == orjson.loads(orjson.dumps(docs))
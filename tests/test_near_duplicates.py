@@ -0,0 +1,36 @@
+from near_duplicates import NearDuplicateIndex, jaccard, shingles
+
+TEXTS = [
+    "Draw a cat wearing a top hat",
+    "Draw a dog surfing a giant wave",
+    "🐱🎩",
+    "🐶🌊!!",
+    "Draw a castle made of candy",
+]
+
+
+def build(texts):
+    index = NearDuplicateIndex(lambda position: texts[position])
+    for position, text in enumerate(texts):
+        index.add(position, text)
+    return index
+
+
+def test_rewordings_are_found():
+    index = build(TEXTS)
+    matches = index.find("Sketch a cat wearing a top-hat!", 0.6)
+    assert [position for position, _ in matches] == [0]
+    assert matches[0][1] == 1.0
+    assert index.find("Draw a rocket on the moon", 0.6) == []
+
+
+def test_texts_without_words_match_nothing():
+    assert shingles("🐱🎩") == shingles("?!") == set()
+    assert jaccard(shingles("🐱🎩"), shingles("🐶🌊!!")) == 0.0
+
+    index = build(TEXTS)
+    assert len(index) == len(TEXTS)
+    assert index.find("🐱🎩", 0.0) == []
+    assert index.find("🐢", 0.6) == []
+    # Token-less ideas don't crowd the candidates of real ones
+    assert 2 not in index.candidates(shingles("Draw a cat wearing a top hat"))
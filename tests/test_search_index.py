@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+import search_index
+from search_index import BLOCK_SIZE, TokenIndex, tokenize
+
+WORDS = ["draw", "drawing", "dragon", "cat", "castle", "catapult", "ocean", "octopus", "robot", "rocket", "tree"]
+
+QUERIES = ["dra", "draw", "ca", "cat", "oct", "x", "draw cat", "dra ca", "cas drag", "robot rocket tree", "Drá"]
+
+
+def make_texts(count, seed=7):
+    rng = random.Random(seed)
+    # "draw" in every idea makes one token span many blocks
+    return ["draw " + " ".join(rng.sample(WORDS, 3)) + f" n{index}" for index in range(count)]
+
+
+def matching(texts, query):
+    terms = set(tokenize(query))
+    return {
+        position for position, text in enumerate(texts)
+        if all(any(token.startswith(term) for token in tokenize(text)) for term in terms)
+    }
+
+
+def index_one_by_one(texts):
+    index = TokenIndex()
+    # The first load is one bulk rebuild, the rest inserts into (and splits) blocks
+    index.extend(enumerate(texts[:100]))
+    for position in range(100, len(texts)):
+        index.add(position, texts[position])
+    return index
+
+
+@pytest.mark.parametrize("intersect_max", [0, search_index.INTERSECT_MAX_ENTRIES])
+def test_search_matches_brute_force(monkeypatch, intersect_max):
+    monkeypatch.setattr(search_index, "INTERSECT_MAX_ENTRIES", intersect_max)
+    texts = make_texts(1500)
+    bulk = TokenIndex()
+    bulk.extend(enumerate(texts))
+    for index in (index_one_by_one(texts), bulk):
+        assert len(index._tokens) > 2
+        assert all(len(tokens) <= 2 * BLOCK_SIZE for tokens in index._tokens)
+        for query in QUERIES:
+            assert set(index.search(query, len(texts))) == matching(texts, query), query
+
+
+def test_search_stops_at_limit():
+    texts = make_texts(300)
+    index = index_one_by_one(texts)
+    for query in ("draw", "draw cat"):
+        found = index.search(query, 5)
+        assert len(found) == len(set(found)) == 5
+        assert set(found) <= matching(texts, query)
+
+
+def test_words_repeated_in_a_text_count_once():
+    index = TokenIndex()
+    index.add(0, "Draw a cat drawing a cat")
+    index.add(0, "ignored: position already indexed")
+    assert index.search("dra", 10) == [0]
+    assert index.search("ignored", 10) == []
+    assert index.search("  ", 10) == []
+    assert len(index) == 1
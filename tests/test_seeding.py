@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import DrawingIdea
+from random_pool import RandomIdeaPool
+from seeding import SEED_NAME, seed_fingerprint, sync_default_ideas
+
+pytestmark = pytest.mark.anyio
+
+TEXTS = ["Draw a cat", "Draw a dog", "Draw a fish"]
+
+
+async def stored(repository):
+    return {row["text"]: row["tags"] async for row in repository.iter_ideas()}
+
+
+async def test_first_sync_inserts_everything_once(repository):
+    assert await sync_default_ideas(repository, TEXTS, "worker-a") == 3
+    assert await stored(repository) == {text: [] for text in TEXTS}
+    # Unchanged defaults: nothing to do, not even taking the lease
+    await repository.acquire_lease(SEED_NAME, "worker-b", 60)
+    assert await sync_default_ideas(repository, TEXTS, "worker-a") == 0
+
+
+async def test_changes_are_applied_incrementally(repository):
+    await sync_default_ideas(repository, TEXTS, "worker-a")
+
+    written = await sync_default_ideas(
+        repository, TEXTS + ["draw a CAT", "Draw a bird"], "worker-a", tags={"Draw a dog": ["Animals"]}
+    )
+    # The dog gains a tag, the bird is new, the re-cased cat is the same idea
+    assert written == 2
+    ideas = await stored(repository)
+    assert len(ideas) == 4
+    assert ideas["Draw a dog"] == ["animals"]
+
+
+async def test_worker_without_the_lease_skips_the_sync(repository):
+    await repository.acquire_lease(SEED_NAME, "worker-a", 60)
+    assert await sync_default_ideas(repository, TEXTS, "worker-b") == 0
+    assert await repository.count() == 0
+
+    await repository.release_lease(SEED_NAME, "worker-a")
+    assert await sync_default_ideas(repository, TEXTS, "worker-b") == 3
+    # The lease is released after the sync
+    assert await repository.acquire_lease(SEED_NAME, "worker-c", 60)
+
+
+async def test_removed_defaults_stay(repository):
+    await sync_default_ideas(repository, TEXTS, "worker-a")
+    await sync_default_ideas(repository, TEXTS[:1], "worker-a")
+    assert len(await stored(repository)) == 3
+    state = await repository.get_seed_state(SEED_NAME)
+    assert state["fingerprint"] == seed_fingerprint(TEXTS[:1])
+
+
+async def test_warm_pool_picks_up_tags_added_by_a_sync(repository):
+    await sync_default_ideas(repository, TEXTS, "worker-a")
+    # A submission well after the defaults, so top-ups no longer re-read them
+    await repository.insert_many([DrawingIdea(text="Draw a robot", created_at=datetime.utcnow() + timedelta(hours=1))])
+    pool = RandomIdeaPool()
+    await pool.refresh(repository)
+
+    # Another worker re-tags existing defaults long after this pool loaded them
+    await sync_default_ideas(repository, TEXTS, "worker-b", tags={"Draw a dog": ["Animals"], "Draw a cat": ["animals"]})
+    await pool.refresh(repository)
+    assert {pool.get(index, "animals")["text"] for index in range(pool.size("animals"))} == {"Draw a cat", "Draw a dog"}
+    assert pool.tag_counts() == {"animals": 2}
+    assert pool.size() == 4
+
+
+def test_fingerprint_covers_tags():
+    assert seed_fingerprint(TEXTS) == seed_fingerprint(list(TEXTS))
+    assert seed_fingerprint(TEXTS) != seed_fingerprint(TEXTS, {"Draw a cat": ["animals"]})
+    assert seed_fingerprint(["ab", "c"]) != seed_fingerprint(["a", "bc"])
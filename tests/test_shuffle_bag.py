@@ -0,0 +1,103 @@
+import pytest
+
+from shuffle_bag import ShuffleBag, ShuffleBagStore, permute
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100, 1000, 4097])
+def test_permute_is_a_bijection(size):
+    for seed in (0, 1, 2**63 + 5):
+        assert sorted(permute(index, size, seed) for index in range(size)) == list(range(size))
+
+
+def test_permute_depends_on_seed():
+    first = [permute(index, 100, 1) for index in range(100)]
+    second = [permute(index, 100, 2) for index in range(100)]
+    assert first != second
+    assert first != list(range(100))
+
+
+def test_bag_serves_everything_once_per_cycle():
+    bag = ShuffleBag(50, expires_at=0)
+    first_cycle = [bag.draw(50) for _ in range(50)]
+    assert sorted(first_cycle) == list(range(50))
+    second_cycle = [bag.draw(50) for _ in range(50)]
+    assert sorted(second_cycle) == list(range(50))
+
+
+def test_bag_mixes_in_ideas_added_during_the_cycle():
+    bag = ShuffleBag(10, expires_at=0)
+    drawn = [bag.draw(10) for _ in range(4)]
+    # Three ideas join the pool mid-cycle
+    drawn += [bag.draw(13) for _ in range(9)]
+    assert sorted(drawn) == list(range(13))
+    new_ones = [index for index in drawn if index >= 10]
+    assert new_ones == [10, 11, 12]
+
+
+def test_store_keeps_sessions_and_restarts_on_tag_change():
+    store = ShuffleBagStore(ttl_seconds=60, max_sessions=2)
+    token, bag = store.get_or_create(None, 5)
+    bag.draw(5)
+    assert store.get_or_create(token, 5) == (token, bag)
+    assert bag.position == 1
+
+    same_token, same_bag = store.get_or_create(token, 3, tag="animals")
+    assert same_token == token and same_bag.tag == "animals" and same_bag.position == 0
+
+    other, _ = store.get_or_create("unknown", 5)
+    assert other != "unknown"
+    store.get_or_create(None, 5)
+    # The least recently used session made room for the third
+    assert len(store) == 2
+    assert store.get_or_create(token, 5)[0] != token
+
+
+def test_store_expires_idle_sessions():
+    store = ShuffleBagStore(ttl_seconds=-1)
+    token, _ = store.get_or_create(None, 5)
+    assert store.get_or_create(token, 5)[0] != token
+
+
+async def test_random_session_serves_every_idea_before_repeating(client):
+    total = len((await client.get("/api/ideas")).json())
+    session, seen = "new", []
+    for _ in range(total):
+        response = await client.get("/api/ideas/random", params={"session": session})
+        session = response.headers["x-shuffle-session"]
+        seen.append(response.json()["id"])
+    assert len(set(seen)) == total
+
+
+def test_remaining_counts_down_the_cycle_and_new_ideas():
+    bag = ShuffleBag(3, expires_at=0)
+    bag.draw(3)
+    assert bag.remaining(3) == 2
+    assert bag.remaining(5) == 4
+    for _ in range(4):
+        bag.draw(5)
+    assert bag.remaining(5) == 0
+
+
+async def test_session_lists_are_distinct_and_skip_excluded_ideas(client):
+    all_ids = [idea["id"] for idea in (await client.get("/api/ideas")).json()]
+    total = len(all_ids)
+    count = total * 3 // 4
+
+    session, served = "new", []
+    for _ in range(4):
+        response = await client.get("/api/ideas/random", params={"session": session, "count": count})
+        session = response.headers["x-shuffle-session"]
+        ids = [idea["id"] for idea in response.json()]
+        assert ids and len(ids) == len(set(ids))
+        served.append(ids)
+    # The second list stops where the first cycle ends; the third starts the next
+    assert len(served[0]) == count and len(served[1]) == total - count
+    assert sorted(served[0] + served[1]) == sorted(all_ids)
+
+    excluded = all_ids[:total - 5]
+    response = await client.get(
+        "/api/ideas/random", params={"session": "new", "count": 5, "exclude": ",".join(excluded)}
+    )
+    assert sorted(idea["id"] for idea in response.json()) == sorted(all_ids[total - 5:])
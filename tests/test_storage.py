@@ -0,0 +1,192 @@
+"""Contract shared by the storage backends that run in-process (memory, sqlite)"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import IDEA_RESPONSE_FIELDS, DrawingIdea
+from storage import DuplicateIdeaError
+
+pytestmark = pytest.mark.anyio
+
+BASE_TIME = datetime(2025, 1, 9, 10, 30)
+
+
+def make_ideas(count, tags=()):
+    return [
+        DrawingIdea(text=f"Draw idea number {i}", created_at=BASE_TIME + timedelta(minutes=i), tags=list(tags))
+        for i in range(count)
+    ]
+
+
+async def test_create_and_list_newest_first(repository):
+    ideas = make_ideas(3)
+    for idea in ideas:
+        await repository.create(idea)
+
+    listed = await repository.list_ideas(limit=10)
+    assert [row["id"] for row in listed] == [idea.id for idea in reversed(ideas)]
+    assert set(listed[0]) == set(IDEA_RESPONSE_FIELDS)
+    assert listed[0]["created_at"] == ideas[-1].created_at
+    assert await repository.count() == 3
+
+
+async def test_create_rejects_same_normalized_text(repository):
+    await repository.create(DrawingIdea(text="Draw a Cat"))
+    with pytest.raises(DuplicateIdeaError):
+        await repository.create(DrawingIdea(text="  draw a cat  "))
+    assert await repository.count() == 1
+
+
+async def test_insert_many_reports_duplicates(repository):
+    await repository.create(DrawingIdea(text="Draw a fox"))
+    inserted = await repository.insert_many([
+        DrawingIdea(text="Draw a FOX"),
+        DrawingIdea(text="Draw an owl"),
+        DrawingIdea(text="draw an owl"),
+    ])
+    assert inserted == [False, True, False]
+    assert await repository.existing_keys(["draw a fox", "draw an owl", "draw a bear"]) == {
+        "draw a fox", "draw an owl"
+    }
+
+
+async def test_keyset_pages_cover_every_idea_once(repository):
+    ideas = make_ideas(7)
+    # Two ideas sharing a timestamp are ordered by id
+    ideas.append(DrawingIdea(text="Draw a tie", created_at=ideas[3].created_at))
+    await repository.insert_many(ideas)
+
+    seen, after = [], None
+    while True:
+        page = await repository.list_ideas(limit=3, after=after)
+        if not page:
+            break
+        seen += page
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+    expected = sorted(ideas, key=lambda idea: (idea.created_at, idea.id), reverse=True)
+    assert [row["id"] for row in seen] == [idea.id for idea in expected]
+
+
+async def test_tag_filters(repository):
+    await repository.insert_many(make_ideas(2, tags=["animals"]) + [DrawingIdea(text="Draw a tree", tags=["nature"])])
+
+    tagged = await repository.list_ideas(limit=10, tag="animals")
+    assert len(tagged) == 2
+    assert all(row["tags"] == ["animals"] for row in tagged)
+    assert await repository.tag_counts() == {"animals": 2, "nature": 1}
+    assert [row["text"] for row in await repository.random_ideas(5, tag="nature")] == ["Draw a tree"]
+
+
+async def test_iter_ideas_oldest_first_since(repository):
+    ideas = make_ideas(5)
+    await repository.insert_many(ideas)
+
+    assert [row["id"] async for row in repository.iter_ideas()] == [idea.id for idea in ideas]
+    since = [row["id"] async for row in repository.iter_ideas(since=ideas[2].created_at, batch_size=2)]
+    assert since == [idea.id for idea in ideas[2:]]
+
+
+async def test_random_ideas_are_distinct_and_skip_excluded(repository):
+    ideas = make_ideas(6)
+    await repository.insert_many(ideas)
+
+    excluded = {idea.id for idea in ideas[:4]}
+    picked = await repository.random_ideas(5, exclude=excluded)
+    assert {row["id"] for row in picked} == {idea.id for idea in ideas[4:]}
+    assert len(await repository.random_ideas(3)) <= 3
+
+
+async def test_search_matches_words(repository):
+    await repository.insert_many([
+        DrawingIdea(text="Draw a dragon reading a book"),
+        DrawingIdea(text="Sketch a robot making pancakes"),
+    ])
+    found = await repository.search_ideas("dragon", 10)
+    assert [row["text"] for row in found] == ["Draw a dragon reading a book"]
+    assert await repository.search_ideas("!!!", 10) == []
+
+
+async def test_upsert_ideas_merges_tags_of_existing_ideas(repository):
+    await repository.create(DrawingIdea(text="Draw a whale", tags=["animals"]))
+
+    inserted = await repository.upsert_ideas([
+        DrawingIdea(text="draw a whale", tags=["ocean"]),
+        DrawingIdea(text="Draw a lighthouse", tags=["ocean"]),
+    ])
+    assert inserted == 1
+    whale = (await repository.search_ideas("whale", 1))[0]
+    assert whale["tags"] == ["animals", "ocean"]
+    assert await repository.tag_counts() == {"animals": 1, "ocean": 2}
+
+
+async def test_seed_state_round_trip(repository):
+    assert await repository.get_seed_state("defaults") is None
+    await repository.save_seed_state("defaults", "abc", [["draw a cat", ["animals"]]])
+    assert await repository.get_seed_state("defaults") == {
+        "fingerprint": "abc", "keys": [["draw a cat", ["animals"]]]
+    }
+
+
+async def test_leases_are_exclusive_until_released(repository):
+    assert await repository.acquire_lease("seed", "worker-a", 60)
+    assert await repository.acquire_lease("seed", "worker-a", 60)
+    assert not await repository.acquire_lease("seed", "worker-b", 60)
+    await repository.release_lease("seed", "worker-a")
+    assert await repository.acquire_lease("seed", "worker-b", 60)
+
+
+async def test_expired_lease_can_be_taken_over(repository):
+    assert await repository.acquire_lease("seed", "worker-a", -1)
+    assert await repository.acquire_lease("seed", "worker-b", 60)
+
+
+async def test_counters_and_top_ideas(repository):
+    ideas = make_ideas(3)
+    await repository.insert_many(ideas)
+    await repository.increment_counters({ideas[0].id: [1, 0], ideas[1].id: [5, 2], "unknown": [9, 9]})
+    await repository.increment_counters({ideas[0].id: [1, 3]})
+
+    top = await repository.top_ideas("drawn_count", 10)
+    assert [(row["id"], row["served_count"], row["drawn_count"]) for row in top] == [
+        (ideas[0].id, 2, 3), (ideas[1].id, 5, 2)
+    ]
+
+
+async def test_version_counters(repository):
+    assert await repository.get_version("drawing_ideas") == 0
+    assert await repository.bump_version("drawing_ideas") == 1
+    assert await repository.bump_version("drawing_ideas") == 2
+    assert await repository.get_version("drawing_ideas") == 2
+
+
+async def test_taken_id_is_a_duplicate(repository):
+    first = DrawingIdea(text="Draw a kite")
+    await repository.create(first)
+    assert await repository.insert_many([DrawingIdea(id=first.id, text="Draw a comet")]) == [False]
+    with pytest.raises(DuplicateIdeaError):
+        await repository.create(DrawingIdea(id=first.id, text="Draw a comet"))
+    assert [row["text"] for row in await repository.list_ideas(limit=5)] == ["Draw a kite"]
+
+
+async def test_aware_timestamps_are_stored_as_naive_utc(repository):
+    eastern = timezone(timedelta(hours=-5))
+    await repository.insert_many([
+        DrawingIdea(text="Draw at noon eastern", created_at=datetime(2025, 1, 9, 12, tzinfo=eastern)),
+        DrawingIdea(text="Draw at three utc", created_at=datetime(2025, 1, 9, 15)),
+    ])
+    listed = await repository.list_ideas(limit=5)
+    assert [(row["text"], row["created_at"]) for row in listed] == [
+        ("Draw at noon eastern", datetime(2025, 1, 9, 17)),
+        ("Draw at three utc", datetime(2025, 1, 9, 15)),
+    ]
+
+
+async def test_schedule_round_trip(repository):
+    assert await repository.get_schedule("daily_challenge") is None
+    state = {"cycle": 1, "used": ["a"], "days": {"2026-10-17": "a"}}
+    await repository.save_schedule("daily_challenge", state)
+    state["days"]["2026-10-18"] = "b"
+    assert await repository.get_schedule("daily_challenge") == {"cycle": 1, "used": ["a"], "days": {"2026-10-17": "a"}}
+    await repository.save_schedule("daily_challenge", state)
+    assert (await repository.get_schedule("daily_challenge"))["days"]["2026-10-18"] == "b"
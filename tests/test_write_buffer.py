@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from models import DrawingIdea
+from write_buffer import IdeaWriteBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingWriter:
+    """Group writer reporting texts containing "dup" as duplicates, or failing every group"""
+
+    def __init__(self, error: Exception = None):
+        self.groups = []
+        self.error = error
+
+    async def __call__(self, ideas):
+        self.groups.append([idea.text for idea in ideas])
+        if self.error:
+            raise self.error
+        return ["dup" not in idea.text for idea in ideas]
+
+
+def ideas(*texts):
+    return [DrawingIdea(text=text) for text in texts]
+
+
+async def test_concurrent_submissions_share_one_write():
+    buffer, writer = IdeaWriteBuffer(max_batch=10, max_delay_seconds=0.05), RecordingWriter()
+    buffer.start(writer)
+    results = await asyncio.gather(*(buffer.submit(idea) for idea in ideas("one", "dup two", "three")))
+    assert results == [True, False, True]
+    assert writer.groups == [["one", "dup two", "three"]]
+    await buffer.close()
+
+
+async def test_groups_stop_at_max_batch():
+    buffer, writer = IdeaWriteBuffer(max_batch=2, max_delay_seconds=0.05), RecordingWriter()
+    buffer.start(writer)
+    await asyncio.gather(*(buffer.submit(idea) for idea in ideas("a", "b", "c", "d", "e")))
+    assert [len(group) for group in writer.groups] == [2, 2, 1]
+    await buffer.close()
+
+
+async def test_a_failed_group_fails_every_waiter():
+    writer = RecordingWriter(error=RuntimeError("insert failed"))
+    buffer = IdeaWriteBuffer(max_delay_seconds=0.05)
+    buffer.start(writer)
+    results = await asyncio.gather(*(buffer.submit(idea) for idea in ideas("a", "b")), return_exceptions=True)
+    assert [str(result) for result in results] == ["insert failed", "insert failed"]
+
+    # The writer keeps going with the next group
+    writer.error = None
+    assert await buffer.submit(DrawingIdea(text="c"))
+    await buffer.close()
+
+
+async def test_cancelled_submissions_are_not_written():
+    buffer, writer = IdeaWriteBuffer(max_delay_seconds=0.05), RecordingWriter()
+    buffer.start(writer)
+    gone = asyncio.create_task(buffer.submit(DrawingIdea(text="gone")))
+    await asyncio.sleep(0)
+    gone.cancel()
+    assert await buffer.submit(DrawingIdea(text="kept"))
+    assert writer.groups == [["kept"]]
+    await buffer.close()
+
+
+async def test_grouped_submissions_are_announced_one_by_one(server, client):
+    server.write_buffer.start(server.write_idea_group)
+    subscription = server.idea_stream.subscribe()
+    texts = [f"Draw grouped idea {index}" for index in range(3)]
+    responses = await asyncio.gather(*(client.post("/api/ideas", json={"text": text}) for text in texts))
+    assert [response.status_code for response in responses] == [200, 200, 200]
+
+    frames = [subscription.get_nowait() for _ in range(subscription.qsize())]
+    assert len(frames) == 3
+    assert all(frame.startswith(b"event: idea") for frame in frames)
+    assert sorted(text for text in texts if any(text.encode() in frame for frame in frames)) == texts